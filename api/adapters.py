@@ -0,0 +1,299 @@
+import math
+import time
+
+from games import DigitspanGame, NumerosityGame, ShapedanceGame, FlashbackGame, PathfinderGame
+from games.tileboard import piece_type
+
+
+def is_index(value, size):
+    """True for an int (not a bool) in range(size)."""
+    return type(value) is int and 0 <= value < size
+
+
+def is_number(value):
+    """True for a finite int or float (not a bool)."""
+    return type(value) in (int, float) and math.isfinite(value)
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class GameAdapter:
+    """
+    Maps the start-level / answer / state endpoints onto one game class.
+
+    The game classes keep their state in ``session_state[key]``; adapters only
+    translate JSON payloads into the same method calls the Streamlit widgets
+    make, and build a JSON-safe view of the state.
+    """
+    game_class = None
+
+    @property
+    def key(self):
+        return self.game_class.state_key
+
+    def state(self, game):
+        return game.session_state[self.key]
+
+    def time_left(self, state):
+        return state["total_time"] - (time.time() - state["start_time"])
+
+    def is_over(self, state):
+        return self.game_class.is_over(state)
+
+    def ensure_running(self, game):
+        if self.is_over(self.state(game)):
+            raise ApiError(409, "Game is over.")
+
+    def options(self, payload):
+        """Game constructor settings taken from the create-session payload."""
+        return {}
+
+    def prepare(self, game, payload):
+        """
+        The CPU-heavy part of a start request, as a callable the server runs
+        off its event loop; its result is passed to ``start`` as ``prepared``.
+        None if starting is cheap. It must not touch the game's state.
+        """
+        return None
+
+    def start(self, game, payload=None, prepared=None):
+        raise NotImplementedError
+
+    def answer(self, game, payload):
+        raise NotImplementedError
+
+    def view(self, state):
+        """Fields every game exposes; subclasses add their puzzle fields."""
+        return {
+            "level": state["level"],
+            "score": state["score"],
+            "stage": state["stage"],
+            "time_left": max(0, int(self.time_left(state))),
+            "over": self.is_over(state),
+            "result_message": state.get("result_message", ""),
+        }
+
+
+class DigitspanAdapter(GameAdapter):
+    game_class = DigitspanGame
+
+    def start(self, game, payload=None, prepared=None):
+        self.ensure_running(game)
+        game.start_level()
+        state = self.state(game)
+        # The client is responsible for hiding the sequence after display_time,
+        # so it is only ever sent in the start response.
+        view = self.view(state)
+        view.update({
+            "sequence": state["current_sequence"],
+            "display_time": state["display_time"],
+        })
+        game.hide_sequence()
+        return view
+
+    def answer(self, game, payload):
+        self.ensure_running(game)
+        state = self.state(game)
+        if state["stage"] != "input":
+            raise ApiError(409, "No sequence to answer; start a level first.")
+        game.session_state["input_answer"] = str(payload.get("answer", ""))
+        game.check_answer()
+        return self.view(state)
+
+
+class NumerosityAdapter(GameAdapter):
+    game_class = NumerosityGame
+
+    def prepare(self, game, payload):
+        """Mixed-operator puzzles run the solver for up to a few hundred ms; make them off the loop."""
+        state = self.state(game)
+        mode = payload.get("mode", state.get("mode"))
+        if mode != "mixed" or self.is_over(state):
+            return None
+        level = state["level"]
+        return lambda: (level, game.make_mixed_puzzle(level))
+
+    def start(self, game, payload=None, prepared=None):
+        self.ensure_running(game)
+        mode = (payload or {}).get("mode")
+        if mode is not None:
+            if mode not in ("classic", "mixed"):
+                raise ApiError(400, "'mode' must be \"classic\" or \"mixed\".")
+            game.set_mode(mode)
+        state = self.state(game)
+        puzzle = None
+        if prepared is not None and state.get("mode") == "mixed" and prepared[0] == state["level"]:
+            puzzle = prepared[1]  # still for this level: no other request moved the game on meanwhile
+        game.generate_puzzle(puzzle)
+        return self.view(state)
+
+    def answer(self, game, payload):
+        self.ensure_running(game)
+        state = self.state(game)
+        if state["stage"] != "challenge":
+            raise ApiError(409, "No puzzle to answer; start a level first.")
+        if state.get("mode") == "mixed":
+            expression = payload.get("expression")
+            if not isinstance(expression, str) or len(expression) > 200:
+                raise ApiError(400, "'expression' must be a string such as \"(12 - 4) * 3\".")
+            game.submit_expression(expression)
+            return self.view(state)
+        selected = payload.get("selected")
+        if (not isinstance(selected, list)
+                or not all(is_index(i, len(state["pool"])) for i in selected)
+                or len(set(selected)) != len(selected)):
+            raise ApiError(400, "'selected' must be a list of distinct pool indices.")
+        state["selected"] = selected
+        game.submit_answer()
+        return self.view(state)
+
+    def view(self, state):
+        view = super().view(state)
+        view["mode"] = state.get("mode", "classic")
+        if state["stage"] == "challenge":
+            view.update({
+                "operator": state["operator"],
+                "target": state["target"],
+                "pool": state["pool"],
+            })
+            if view["mode"] == "mixed":
+                view.update({
+                    "max_terms": state["max_terms"],
+                    "solutions": state["solutions"],
+                })
+        return view
+
+
+class ShapedanceAdapter(GameAdapter):
+    game_class = ShapedanceGame
+
+    def start(self, game, payload=None, prepared=None):
+        self.ensure_running(game)
+        game.start_level()
+        return self.view(self.state(game))
+
+    def answer(self, game, payload):
+        self.ensure_running(game)
+        state = self.state(game)
+        if state["stage"] != "active":
+            raise ApiError(409, "No level to answer; start a level first.")
+        selected = payload.get("selected")
+        if (not isinstance(selected, list) or len(selected) != 2 or selected[0] == selected[1]
+                or not all(is_index(i, state["num_cubes"]) for i in selected)):
+            raise ApiError(400, "'selected' must be two distinct cube indices.")
+        state["selected"] = []
+        for index in selected:
+            game.toggle_selection(index)
+        return self.view(state)
+
+    def view(self, state):
+        view = super().view(state)
+        if state["stage"] == "active":
+            view.update({
+                "patterns": state["current_patterns"],
+                "transformations": state["transformations"],
+            })
+        return view
+
+
+class FlashbackAdapter(GameAdapter):
+    game_class = FlashbackGame
+
+    def options(self, payload):
+        """Optional "n_back" (1-4), "match_rate" and "lure_rate" (summing to at most 1)."""
+        options = {key: payload[key] for key in ("n_back", "match_rate", "lure_rate") if key in payload}
+        n_back = options.get("n_back", 1)
+        if type(n_back) is not int or not 1 <= n_back <= 4:
+            raise ApiError(400, "'n_back' must be an integer from 1 to 4.")
+        rates = [options.get(key, default) for key, default in (("match_rate", 0.3), ("lure_rate", 0.1))]
+        if not all(is_number(rate) and rate >= 0 for rate in rates) or sum(rates) > 1:
+            raise ApiError(400, "'match_rate' and 'lure_rate' must be >= 0 and sum to at most 1.")
+        return options
+
+    def start(self, game, payload=None, prepared=None):
+        self.ensure_running(game)
+        state = self.state(game)
+        if state["stage"] != "init":
+            raise ApiError(409, "Answer the current shape first.")
+        # The client shows the shape for as long as it likes; the first n
+        # shapes have nothing to compare with and the game goes back to init.
+        game.next_shape()
+        game.end_display()
+        view = self.view(state)
+        view["n_back"] = state["n_back"]
+        view["shape"] = {k: state["current_shape"][k] for k in ("shape", "color", "index")}
+        return view
+
+    def answer(self, game, payload):
+        self.ensure_running(game)
+        state = self.state(game)
+        if state["stage"] != "input":
+            raise ApiError(409, "No shape to answer; start a level first.")
+        match = payload.get("match")
+        if not isinstance(match, bool):
+            raise ApiError(400, "'match' must be true or false.")
+        game.check_answer(match)
+        return self.view(state)
+
+
+class PathfinderAdapter(GameAdapter):
+    game_class = PathfinderGame
+
+    def start(self, game, payload=None, prepared=None):
+        self.ensure_running(game)
+        mode = (payload or {}).get("mode")
+        if mode is not None:
+            if mode not in ("reorder", "board"):
+                raise ApiError(400, "'mode' must be \"reorder\" or \"board\".")
+            game.set_mode(mode)
+        game.new_puzzle()
+        return self.view(self.state(game))
+
+    def answer(self, game, payload):
+        self.ensure_running(game)
+        state = self.state(game)
+        if state["stage"] != "puzzle":
+            raise ApiError(409, "No puzzle to answer; start a level first.")
+        if state.get("mode") == "board":
+            rotate = payload.get("rotate")
+            cells = len(state["board"]["tiles"])
+            if not is_index(rotate, cells):
+                raise ApiError(400, "'rotate' must be a tile index.")
+            game.rotate_tile(rotate)
+            return self.view(state)
+        puzzle = state["current_puzzle"]
+        pieces = {piece["id"]: piece for piece in puzzle["scrambled_order"]}
+        order = payload.get("order")
+        if (not isinstance(order, list) or not all(type(i) is int for i in order)
+                or sorted(order) != sorted(pieces)):
+            raise ApiError(400, "'order' must be a permutation of the piece ids.")
+        puzzle["scrambled_order"] = [pieces[piece_id] for piece_id in order]
+        game.check_solution()
+        return self.view(state)
+
+    def view(self, state):
+        view = super().view(state)
+        view["mode"] = state.get("mode", "reorder")
+        if state["stage"] == "puzzle" and view["mode"] == "board":
+            view["board"] = dict(state["board"], types=[piece_type(t) for t in state["board"]["tiles"]])
+            view["moves"] = state["moves"]
+        elif state["stage"] == "puzzle":
+            view["pieces"] = state["current_puzzle"]["scrambled_order"]
+        return view
+
+
+ADAPTERS = {
+    adapter.key: adapter
+    for adapter in (
+        DigitspanAdapter(),
+        NumerosityAdapter(),
+        ShapedanceAdapter(),
+        FlashbackAdapter(),
+        PathfinderAdapter(),
+    )
+}
@@ -0,0 +1,234 @@
+"""
+Minimal asyncio HTTP/JSON front end for the games.
+
+Endpoints:
+    POST   /sessions                 {"game": "digitspan"}  -> new session
+                                     (flashback also takes "n_back", "match_rate", "lure_rate")
+    GET    /sessions/<id>            current state
+    POST   /sessions/<id>/start      start the next level (optional {"mode": ...} for some games)
+    POST   /sessions/<id>/answer     submit an answer (payload depends on the game)
+    DELETE /sessions/<id>            end the session
+    GET    /ready                    200 once the boot warm-up has ended, 503 before
+
+Run with:  python -m api.server --port 8080
+"""
+import argparse
+import asyncio
+import json
+
+from runtime import warmup
+from .adapters import ADAPTERS, ApiError
+from .sessions import SessionTable
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+MAX_BODY = 64 * 1024
+
+
+class GameServer:
+    def __init__(self, sessions=None, sweep_interval=30):
+        self.sessions = SessionTable() if sessions is None else sessions
+        self.sweep_interval = sweep_interval
+
+    # ---------- Routing ---------- #
+
+    @staticmethod
+    def _parts(path):
+        return [p for p in path.split("?", 1)[0].split("/") if p]
+
+    def dispatch(self, method, path, payload, prepared=None):
+        parts = self._parts(path)
+        if parts == ["ready"]:
+            if not warmup.finished.is_set():
+                raise ApiError(503, "Warming up.")
+            # A failed warm-up only means lazy first-use costs; the server still works.
+            body = {"ready": True, "warmed": warmup.ready.is_set(),
+                    "warmup_ms": round(warmup.timings["total"] * 1000, 1)}
+            if warmup.error is not None:
+                body["error"] = f"{type(warmup.error).__name__}: {warmup.error}"
+            return 200, body
+        if not parts or parts[0] != "sessions" or len(parts) > 3:
+            raise ApiError(404, "Unknown endpoint.")
+
+        if len(parts) == 1:
+            if method != "POST":
+                raise ApiError(405, "Use POST to create a session.")
+            game_name = payload.get("game")
+            if not isinstance(game_name, str) or game_name not in ADAPTERS:
+                raise ApiError(400, "Unknown game.")
+            session = self.sessions.create(game_name, ADAPTERS[game_name].options(payload))
+            body = session.adapter.view(session.adapter.state(session.game))
+            body.update({"session_id": session.id, "game": session.game_name})
+            return 201, body
+
+        session = self.sessions.get(parts[1])
+        if session is None:
+            raise ApiError(404, "Unknown or expired session.")
+        adapter, game = session.adapter, session.game
+
+        if len(parts) == 2:
+            if method == "GET":
+                return 200, adapter.view(adapter.state(game))
+            if method == "DELETE":
+                self.sessions.delete(session.id)
+                return 200, {"deleted": session.id}
+            raise ApiError(405, "Use GET or DELETE on a session.")
+
+        if method != "POST":
+            raise ApiError(405, "Use POST for game actions.")
+        if parts[2] == "start":
+            return 200, adapter.start(game, payload, prepared)
+        if parts[2] == "answer":
+            return 200, adapter.answer(game, payload)
+        raise ApiError(404, "Unknown endpoint.")
+
+    # ---------- HTTP ---------- #
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self.write_response(writer, 400, {"error": "Invalid Content-Length."}, keep_alive=False)
+                    break
+                if length > MAX_BODY:
+                    self.write_response(writer, 413, {"error": "Body too large."}, keep_alive=False)
+                    break
+                raw = await reader.readexactly(length) if length else b""
+
+                status, body = await self.respond(method, path, raw)
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version == "HTTP/1.1"
+                )
+                self.write_response(writer, status, body, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method, path, raw):
+        """
+        handle_request for the socket server. The CPU-heavy part of a start
+        request (see GameAdapter.prepare) runs on the default executor, so a
+        slow puzzle does not stall every other connection on the loop.
+        """
+        prepared = None
+        work = self.prepare(method, path, raw)
+        if work is not None:
+            try:
+                prepared = await asyncio.get_running_loop().run_in_executor(None, work)
+            except Exception:
+                pass  # start() makes the puzzle itself and reports any error
+        return self.handle_request(method, path, raw, prepared)
+
+    def prepare(self, method, path, raw):
+        """The adapter's executor work for a start request, or None."""
+        parts = self._parts(path)
+        if method != "POST" or len(parts) != 3 or parts[0] != "sessions" or parts[2] != "start":
+            return None
+        try:
+            payload = json.loads(raw) if raw else {}
+        except ValueError:
+            return None
+        session = self.sessions.get(parts[1])
+        if not isinstance(payload, dict) or session is None:
+            return None
+        return session.adapter.prepare(session.game, payload)
+
+    def handle_request(self, method, path, raw, prepared=None):
+        try:
+            payload = json.loads(raw) if raw else {}
+            if not isinstance(payload, dict):
+                raise ApiError(400, "Body must be a JSON object.")
+            return self.dispatch(method, path, payload, prepared)
+        except ApiError as e:
+            return e.status, {"error": e.message}
+        except json.JSONDecodeError:
+            return 400, {"error": "Body is not valid JSON."}
+        except Exception as e:  # keep the server up if a game raises
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    def write_response(self, writer, status, body, keep_alive=True):
+        data = json.dumps(body, separators=(",", ":")).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+
+    # ---------- Lifecycle ---------- #
+
+    async def sweep_sessions(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sessions.expire()
+            self.sessions.expire_logs()
+
+    async def serve(self, host="127.0.0.1", port=8080, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        sweeper = asyncio.create_task(self.sweep_sessions())
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sweeper.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JobJitsu JSON game API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ttl", type=int, default=900, help="idle session lifetime in seconds")
+    parser.add_argument("--event-dir", default=None,
+                        help="write per-session event logs here and restore sessions from them")
+    parser.add_argument("--log-ttl", type=int, default=7 * 24 * 3600,
+                        help="delete event logs untouched for this many seconds")
+    args = parser.parse_args()
+
+    server = GameServer(SessionTable(ttl=args.ttl, event_dir=args.event_dir, log_ttl=args.log_ttl))
+    warmup.start()  # /ready answers 503 until it has finished
+    print(f"Serving JobJitsu API on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+
+from games import SessionState
+from runtime.eventlog import EventLog
+from .adapters import ADAPTERS
+
+
+class Session:
+    def __init__(self, game_name, session_id=None, event_log=None, state=None, options=None):
+        self.id = session_id or uuid.uuid4().hex
+        self.game_name = game_name
+        self.state = SessionState() if state is None else state
+        self.adapter = ADAPTERS[game_name]
+        self.event_log = event_log
+        self.game = self.adapter.game_class(self.state, event_log=event_log, **(options or {}))
+        self.last_seen = time.monotonic()
+
+
+class SessionTable:
+    """
+    In-memory session table with idle expiry.
+
+    Sessions are kept in least-recently-used order, so an expiry sweep only
+    walks the sessions that are actually idle and stops at the first live one.
+
+    With an ``event_dir`` every session writes an event log there, and a
+    session missing from the table (e.g. after a restart) is rebuilt from it.
+    Logs untouched for ``log_ttl`` seconds are deleted by ``expire_logs``.
+    """
+
+    def __init__(self, ttl=900, max_sessions=100_000, event_dir=None, log_ttl=7 * 24 * 3600):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.event_dir = event_dir
+        self.log_ttl = max(log_ttl, ttl)  # never delete a log that could still be restored
+        self._sessions = OrderedDict()
+        self._logs_swept = 0.0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, game_name, options=None):
+        """A new session; ``options`` are passed on to the game's constructor."""
+        if game_name not in ADAPTERS:
+            raise KeyError(game_name)
+        self.expire()
+        if len(self._sessions) >= self.max_sessions:
+            # Table is full of live sessions; drop the least recently used one.
+            _, dropped = self._sessions.popitem(last=False)
+            self._close(dropped)
+        session_id = uuid.uuid4().hex
+        event_log = EventLog(self.event_dir, session_id) if self.event_dir else None
+        session = Session(game_name, session_id, event_log, options=options)
+        self._sessions[session.id] = session
+        return session
+
+    def restore(self, session_id):
+        """Rebuilds a session from its event log, or returns None if there is none."""
+        if not self.event_dir or not re.fullmatch(r"[0-9a-f]{32}", session_id):
+            return None
+        if not EventLog.exists(self.event_dir, session_id):
+            return None
+        # A log untouched for longer than the ttl belongs to an expired session.
+        log_path = os.path.join(self.event_dir, f"{session_id}.log")
+        if time.time() - os.path.getmtime(log_path) > self.ttl:
+            return None
+        event_log = EventLog.restore(self.event_dir, session_id)
+        states = event_log.restored_states()
+        if len(states) != 1:
+            return None
+        (game_name, state), = states.items()
+        session = Session(game_name, session_id, event_log, SessionState({game_name: state}))
+        self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id):
+        """Returns the session and marks it as used, or None if unknown or expired."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return self.restore(session_id)
+        now = time.monotonic()
+        if now - session.last_seen > self.ttl:
+            del self._sessions[session_id]
+            self._close(session)
+            return None
+        session.last_seen = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id):
+        """Ends a session for good: its event log is removed, so it cannot be restored."""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            # Not in memory (e.g. after a restart), but it may still have a log.
+            session = self.restore(session_id)
+            if session is None:
+                return False
+            del self._sessions[session_id]
+        if session.event_log is not None:
+            session.event_log.delete()
+        return True
+
+    @staticmethod
+    def _close(session):
+        """Closes a session dropped from the table; its log stays, for restore and replay."""
+        if session.event_log is not None:
+            session.event_log.close()
+
+    def expire(self):
+        """Drops every session that has been idle for longer than the ttl."""
+        cutoff = time.monotonic() - self.ttl
+        expired = 0
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_seen > cutoff:
+                break
+            _, session = self._sessions.popitem(last=False)
+            self._close(session)
+            expired += 1
+        return expired
+
+    def expire_logs(self, every=3600):
+        """Deletes expired event logs, scanning the directory at most once per ``every`` seconds."""
+        if not self.event_dir or time.monotonic() - self._logs_swept < every:
+            return 0
+        self._logs_swept = time.monotonic()
+        return EventLog.expire(self.event_dir, self.log_ttl)
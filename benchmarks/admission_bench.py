@@ -0,0 +1,86 @@
+"""
+Admission control under a hiring-event burst (simulated).
+
+Sessions arrive all at once and play for a few minutes, rerunning every few
+seconds. Rerun latency is modelled as growing linearly with the number of
+sessions playing at the same time (they share the script threads). The
+simulation runs on a fake clock and reports how the cap settles, the rerun
+p95 with and without admission control, and how long players waited.
+
+Usage:  python benchmarks/admission_bench.py --sessions 1000 --target-ms 250
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from runtime.admission import AdmissionController  # noqa: E402
+
+
+def simulate(args, controlled):
+    rng = random.Random(0)
+    now = [0.0]
+    admission = AdmissionController(
+        max_cap=args.sessions if not controlled else args.max_active,
+        target_p95=args.target_ms / 1000 if controlled else None,
+        on_admit=lambda s: heapq.heappush(events, (now[0], s)),
+        clock=lambda: now[0],
+    )
+    events = [(rng.uniform(0, args.ramp), s) for s in range(args.sessions)]
+    heapq.heapify(events)
+    arrived, started, finished = {}, {}, {}
+    latencies = []
+
+    while events:
+        now[0], session = heapq.heappop(events)
+        if session in finished:
+            continue
+        arrived.setdefault(session, now[0])
+        if session in started and now[0] >= started[session] + args.game_seconds:
+            admission.release(session)
+            finished[session] = now[0]
+            continue
+        position = admission.admit(session)
+        if position:
+            heapq.heappush(events, (now[0] + 5, session))  # waiting room poll
+            continue
+        started.setdefault(session, now[0])
+        latency = args.rerun_ms / 1000 * max(1, admission.stats()["active"] / args.threads)
+        latency *= rng.uniform(0.5, 1.5)
+        latencies.append(latency)
+        admission.record_latency(latency)
+        heapq.heappush(events, (now[0] + rng.uniform(1, 4), session))  # next click
+
+    latencies.sort()
+    waits = sorted(started[s] - arrived[s] for s in started)
+    return {
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "p50_wait_s": waits[len(waits) // 2],
+        "max_wait_s": waits[-1],
+        "final_cap": admission.cap,
+        "makespan_s": max(finished.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--ramp", type=float, default=30, help="seconds over which everyone arrives")
+    parser.add_argument("--game-seconds", type=float, default=180)
+    parser.add_argument("--threads", type=int, default=8, help="script threads the reruns share")
+    parser.add_argument("--rerun-ms", type=float, default=20, help="rerun time on an idle server")
+    parser.add_argument("--max-active", type=int, default=200)
+    parser.add_argument("--target-ms", type=float, default=250)
+    args = parser.parse_args()
+
+    for label, controlled in (("no admission control", False), ("admission control", True)):
+        r = simulate(args, controlled)
+        print(f"{label:>21}: rerun p95 {r['p95_ms']:7.0f} ms | wait p50 {r['p50_wait_s']:6.1f}s "
+              f"max {r['max_wait_s']:6.1f}s | final cap {r['final_cap']:5d} | all done after {r['makespan_s']:6.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Requests/sec and tail latency of the JSON API on a single core.
+
+Starts ``python -m api.server`` pinned to one CPU, then drives it with many
+keep-alive connections, each playing Numerosity (start + answer + state).
+
+Usage:  python benchmarks/api_bench.py --connections 200 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def request(reader, writer, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+        + data
+    )
+    await writer.drain()
+    await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    return json.loads(await reader.readexactly(length))
+
+
+async def client(port, deadline, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    session = await request(reader, writer, "POST", "/sessions", {"game": "numerosity"})
+    base = f"/sessions/{session['session_id']}"
+    calls = [
+        ("POST", base + "/start", {}),
+        ("POST", base + "/answer", {"selected": [0, 1, 2]}),
+        ("GET", base, None),
+    ]
+    i = 0
+    while time.perf_counter() < deadline:
+        method, path, body = calls[i % len(calls)]
+        t0 = time.perf_counter()
+        await request(reader, writer, method, path, body)
+        latencies.append(time.perf_counter() - t0)
+        i += 1
+    writer.close()
+
+
+async def run(port, connections, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(client(port, deadline, latencies) for _ in range(connections)))
+    return latencies, time.perf_counter() - started
+
+
+def wait_for_port(port, timeout=10):
+    import socket
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--cpu", type=int, default=0, help="core to pin the server to")
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "api.server", "--port", str(args.port)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        preexec_fn=(lambda: os.sched_setaffinity(0, {args.cpu})) if hasattr(os, "sched_setaffinity") else None,
+    )
+    try:
+        wait_for_port(args.port)
+        latencies, elapsed = asyncio.run(run(args.port, args.connections, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    print(f"connections: {args.connections}  duration: {elapsed:.1f}s  requests: {len(latencies)}")
+    print(f"throughput:  {len(latencies) / elapsed:,.0f} req/s (server on 1 core)")
+    print(f"latency ms:  p50 {pct(0.50):.2f}  p95 {pct(0.95):.2f}  p99 {pct(0.99):.2f}  "
+          f"max {latencies[-1] * 1000:.2f}  mean {statistics.fmean(latencies) * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    main()
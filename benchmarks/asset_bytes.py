@@ -0,0 +1,179 @@
+"""
+Estimated bytes of game markup per session, before and after the static asset pipeline.
+
+This is a model, not a measurement: it renders the HTML strings each game
+emits and multiplies them by assumed rerun counts (below). Streamlit's
+delta and protobuf framing, the rest of each rerun's elements, websocket
+framing and compression are all left out, so real traffic is higher on
+both sides; use the figures to compare the markup, not as bytes on the wire.
+
+"Before" uses the inline-CSS renderers the games shipped with (copied below
+for comparison), including the Numerosity timer that reran the script every
+second; "after" uses the current renderers, whose timer counts down in the
+browser and is only re-sent (as the countdown component's arguments) when
+the player's own actions rerun the script, plus the one-time cost of the
+stylesheet loader, the countdown component, the stylesheet and the sprite
+sheet, which the browser caches.
+
+Usage:  python benchmarks/asset_bytes.py
+"""
+import json
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from games import assets  # noqa: E402
+from games.flashback import FlashbackGame  # noqa: E402
+from games.shapedance import create_cube_html  # noqa: E402
+
+SHAPES = ["circle", "square", "triangle"]
+COLORS = ["red", "orange", "yellow", "green", "blue", "purple"]
+
+# Typical session: 180 s of Numerosity with 30 answers (before, the timer
+# also reran the script once a second), 60 Pathfinder reruns, 12 Shapedance
+# levels with 3 reruns each, 40 Flashback rounds.
+NUMEROSITY_SECONDS, NUMEROSITY_ANSWERS = 180, 30
+PATHFINDER_RERUNS = 60
+SHAPEDANCE_LEVELS, SHAPEDANCE_RERUNS_PER_LEVEL = 12, 3
+FLASHBACK_ROUNDS = 40
+
+
+# ---------- Pre-pipeline renderers (inline CSS) ---------- #
+
+def legacy_shape_html(shape, color, px):
+    half = px // 2
+    if shape == "circle":
+        style = f"width: {px}px; height: {px}px; background-color: {color}; border-radius: 50%; display: inline-block;"
+    elif shape == "square":
+        style = f"width: {px}px; height: {px}px; background-color: {color}; display: inline-block;"
+    else:
+        style = (
+            "width: 0; height: 0; "
+            f"border-left: {half}px solid transparent; "
+            f"border-right: {half}px solid transparent; "
+            f"border-bottom: {px}px solid {color}; "
+            "display: inline-block;"
+        )
+    return f'<div style="{style}"></div>'
+
+
+def legacy_cube_html(pattern, selected, transform):
+    rotation, mirror = transform
+    transform_str = f"rotate({rotation}deg)" + (" scaleX(-1)" if mirror else "")
+    extra_style = "border: 4px solid green;" if selected else ""
+    grid_size = math.ceil(math.sqrt(len(pattern)))
+    grid_html = (
+        f'<div style="display: grid; grid-template-columns: repeat({grid_size}, 1fr); '
+        'grid-gap: 4px; justify-items: center; align-items: center;">'
+    )
+    grid_html += "".join(legacy_shape_html(s, c, 40) for s, c in pattern) + "</div>"
+    container_style = (
+        "display: inline-block; background-color: #4F2E82; border-radius: 8px; "
+        "padding: 16px; margin: 8px; overflow: visible; "
+        f"{extra_style} transform: {transform_str}; transition: transform 1s;"
+    )
+    return f'<div style="{container_style}">{grid_html}</div>'
+
+
+LEGACY_TIMER = """
+            <div style='position:fixed; top:10px; right:20px;
+                        background-color:#f0f0f0; padding:10px 20px;
+                        border-radius:10px; border:1px solid #ddd;
+                        font-weight:bold; font-size:18px; z-index:1000;'>
+                ⏰ Time Left: {remaining} seconds
+            </div>
+            """
+
+LEGACY_PATHFINDER_STYLE = """
+            <style>
+            h3, h4 {
+                color: #FF9900;
+            }
+            .stButton button {
+                background-color: #4F2E82;
+                color: white;
+                font-weight: bold;
+                border-radius: 6px;
+                padding: 0.5em 1em;
+            }
+            </style>
+            """
+
+
+def size(html):
+    return len(html.encode())
+
+
+def session_bytes(rng, legacy):
+    """Per-game bytes of HTML markup emitted over one simulated session."""
+    totals = {}
+
+    # Answers are spread evenly over the game; value = seconds left when given.
+    answers = [NUMEROSITY_SECONDS * (i + 0.5) / NUMEROSITY_ANSWERS for i in range(NUMEROSITY_ANSWERS)]
+    if legacy:
+        # One timer rerun per second, plus one rerun per answer.
+        ticks = list(range(NUMEROSITY_SECONDS, 0, -1)) + [int(left) for left in answers]
+        totals["numerosity"] = sum(size(LEGACY_TIMER.format(remaining=r)) for r in ticks)
+    else:
+        # Only answers rerun the script; each re-sends the countdown's arguments.
+        deadline = 1_700_000_000.0 + NUMEROSITY_SECONDS
+        totals["numerosity"] = sum(
+            size(json.dumps({"deadline": deadline, "now": deadline - left, "key": "_countdown", "default": None}))
+            for left in answers
+        )
+
+    totals["pathfinder"] = PATHFINDER_RERUNS * (
+        size(LEGACY_PATHFINDER_STYLE if legacy else '<span class="jj-pathfinder"></span>')
+    )
+
+    shapedance = 0
+    for level in range(1, SHAPEDANCE_LEVELS + 1):
+        pattern_length = 2 + (level - 1) // 3
+        num_cubes = 4 + 2 * ((level - 1) // 3)
+        cubes = [
+            ([(rng.choice(SHAPES), rng.choice(COLORS)) for _ in range(pattern_length)],
+             (rng.randint(-180, 180), rng.choice([True, False])))
+            for _ in range(num_cubes)
+        ]
+        for rerun in range(SHAPEDANCE_RERUNS_PER_LEVEL):
+            for i, (pattern, transform) in enumerate(cubes):
+                selected = i == rerun
+                render = legacy_cube_html if legacy else create_cube_html
+                shapedance += size(render(pattern, selected, transform))
+    totals["shapedance"] = shapedance
+
+    flashback = FlashbackGame.__new__(FlashbackGame)
+    totals["flashback"] = 0
+    for _ in range(FLASHBACK_ROUNDS):
+        shape, color = rng.choice(SHAPES), rng.choice(COLORS)
+        html = legacy_shape_html(shape, color, 60) if legacy else \
+            flashback.get_shape_html({"shape": shape, "color": color})
+        totals["flashback"] += size(html)
+    return totals
+
+
+def main():
+    before = session_bytes(random.Random(1), legacy=True)
+    after = session_bytes(random.Random(1), legacy=False)
+    one_time = sum(
+        os.path.getsize(os.path.join(assets.STATIC_DIR, name))
+        for name in ("index.html", os.path.join("countdown", "index.html"), assets.STYLESHEET, assets.SPRITES)
+    )
+
+    print("Estimated game markup per session (HTML only; no Streamlit framing, see the docstring)")
+    print(f"{'game':<12}{'before':>10}{'after':>10}{'saved':>8}")
+    for game in before:
+        saved = 1 - after[game] / before[game]
+        print(f"{game:<12}{before[game]:>10,}{after[game]:>10,}{saved:>8.0%}")
+    total_before, total_after = sum(before.values()), sum(after.values())
+    print(f"{'total':<12}{total_before:>10,}{total_after:>10,}{1 - total_after / total_before:>8.0%}")
+    print(f"static assets (fetched once, then cached): {one_time:,} bytes")
+    print(f"total incl. assets: {total_after + one_time:,} bytes "
+          f"({1 - (total_after + one_time) / total_before:.0%} less than before)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Battery generation throughput versus worker processes.
+
+Usage:  python benchmarks/battery_bench.py --candidates 4000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from runtime.batteries import BatteryFile, write_batteries  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=4000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    candidates = [f"candidate-{i:06d}" for i in range(args.candidates)]
+    workers = sorted({1, 2, 4, 8, 16, 32, args.max_workers} & set(range(1, args.max_workers + 1)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cohort.jjb")
+        base = None
+        print(f"{'workers':>8}{'batteries/s':>14}{'speedup':>10}")
+        for n in workers:
+            started = time.perf_counter()
+            write_batteries(candidates, path, cohort_seed="bench", workers=n)
+            rate = len(candidates) / (time.perf_counter() - started)
+            base = base or rate
+            print(f"{n:>8}{rate:>14,.0f}{rate / base:>9.2f}x")
+
+        batteries = BatteryFile(path)
+        started = time.perf_counter()
+        for candidate_id in candidates:
+            batteries.get(candidate_id)
+        lookup = (time.perf_counter() - started) / len(candidates)
+        print(f"file: {os.path.getsize(path) / len(candidates):,.0f} bytes/battery, "
+              f"lookup {lookup * 1e6:.0f} us (incl. decompression)")
+
+
+if __name__ == "__main__":
+    main()
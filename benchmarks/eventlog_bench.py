@@ -0,0 +1,89 @@
+"""
+Event log cost, session rebuild time and replay throughput.
+
+Plays every game through the API adapters with an event log attached, then
+checks that rebuilding from snapshot + log tail (and a full replay) gives
+exactly the live state.
+
+Usage:  python benchmarks/eventlog_bench.py --rounds 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.adapters import ADAPTERS, ApiError  # noqa: E402
+from games import SessionState  # noqa: E402
+from runtime.eventlog import EventLog, replay  # noqa: E402
+
+ANSWERS = {
+    "digitspan": lambda view: {"answer": view["sequence"]},
+    "numerosity": lambda view: {"selected": [0, 1, 2]},
+    "shapedance": lambda view: {"selected": [0, 1]},
+    "flashback": lambda view: {"match": False},
+    "pathfinder": lambda view: {"order": [p["id"] for p in view["pieces"]]},
+}
+
+
+def play(game_name, event_log, rounds):
+    adapter = ADAPTERS[game_name]
+    session_state = SessionState()
+    game = adapter.game_class(session_state, event_log=event_log)
+    for _ in range(rounds):
+        state = adapter.state(game)
+        state["start_time"] = time.time()  # keep the clock from running out
+        if game_name == "digitspan":
+            state["level"] = 1  # stay below the level cap
+        if game_name == "flashback" and state["stage"] == "gameover":
+            state["stage"] = "init"
+        try:
+            view = adapter.start(game)
+            if view["stage"] != "init":
+                adapter.answer(game, ANSWERS[game_name](view))
+        except ApiError:
+            pass
+    return session_state[adapter.key]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'game':<12}{'events':>8}{'us/event':>10}{'bytes/event':>13}"
+              f"{'no-log us':>11}{'rebuild ms':>12}{'replay ev/s':>13}")
+        for game_name in ADAPTERS:
+            t0 = time.perf_counter()
+            play(game_name, None, args.rounds)
+            baseline = time.perf_counter() - t0
+
+            log = EventLog(directory, game_name)
+            t0 = time.perf_counter()
+            live = play(game_name, log, args.rounds)
+            logged = time.perf_counter() - t0
+            events = log.seq
+            size = os.path.getsize(log.log_path)
+            del log  # simulate a crash: no final snapshot
+
+            t0 = time.perf_counter()
+            rebuilt = EventLog.restore(directory, game_name)
+            rebuild_ms = (time.perf_counter() - t0) * 1000
+            assert rebuilt.states[game_name] == live, "rebuild does not match live state"
+            rebuilt.close()
+
+            t0 = time.perf_counter()
+            for _, states in replay(directory, game_name):
+                pass
+            replay_rate = events / (time.perf_counter() - t0)
+            assert states[game_name] == live, "replay does not match live state"
+
+            print(f"{game_name:<12}{events:>8}{logged / events * 1e6:>10.1f}{size / events:>13.0f}"
+                  f"{baseline / events * 1e6:>11.1f}{rebuild_ms:>12.2f}{replay_rate:>13,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Pathfinder board connectivity: incremental update vs full rescan.
+
+For each board size, applies random rotations through Connectivity.rotate
+and compares the cost per move with rebuilding the components from
+scratch, checking the incremental result against the rebuild as it goes.
+
+Usage:  python benchmarks/tileboard_bench.py --moves 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from games.tileboard import Connectivity, generate_board  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--moves", type=int, default=20_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 6, 10, 15])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'board':>7} {'generate':>10} {'rotate':>10} {'rescan':>10}")
+    for size in args.sizes:
+        t0 = time.perf_counter()
+        board = generate_board(size, rng)
+        generate_s = time.perf_counter() - t0
+
+        links = Connectivity(board)
+        cells = size * size
+        moves = [rng.randrange(cells) for _ in range(args.moves)]
+        t0 = time.perf_counter()
+        for index in moves:
+            links.rotate(index)
+        rotate_s = time.perf_counter() - t0
+
+        rescans = max(1, args.moves // 100)
+        t0 = time.perf_counter()
+        for _ in range(rescans):
+            fresh = Connectivity(board)
+        rescan_s = time.perf_counter() - t0
+
+        assert all(links.component(i) == fresh.component(i) for i in range(cells)), \
+            "incremental components differ from a full rescan"
+        print(f"{size:>3}x{size:<3} {generate_s * 1e3:>8.2f}ms {rotate_s / args.moves * 1e6:>8.1f}us "
+              f"{rescan_s / rescans * 1e6:>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Timer wheel with 50k pending session deadlines.
+
+Schedules game-end and stimulus-hide deadlines for many sessions, cancels a
+share of them, then runs the wheel through the whole 5 minute window on a
+simulated clock and checks that every remaining deadline fired within one
+tick of its due time.
+
+Usage:  python benchmarks/timer_wheel_bench.py --deadlines 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from runtime.timers import TimerWheel  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--deadlines", type=int, default=50_000)
+    parser.add_argument("--cancel", type=float, default=0.2, help="share of deadlines cancelled")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = [0.0]
+    wheel = TimerWheel(clock=lambda: now[0])
+    late = []
+
+    def make_callback(due):
+        return lambda: late.append(now[0] - due)
+
+    dues = [rng.choice((rng.uniform(0.5, 3.0), rng.uniform(1, 300))) for _ in range(args.deadlines)]
+    t0 = time.perf_counter()
+    timers = [wheel.schedule(due, make_callback(due)) for due in dues]
+    schedule_s = time.perf_counter() - t0
+    peak = wheel.pending
+
+    cancelled = rng.sample(timers, int(len(timers) * args.cancel))
+    t0 = time.perf_counter()
+    for timer in cancelled:
+        wheel.cancel(timer)
+    cancel_s = time.perf_counter() - t0
+    expected = wheel.pending
+
+    ticks = 0
+    t0 = time.perf_counter()
+    while wheel.pending:
+        ticks += 1
+        now[0] = ticks * wheel.tick
+        wheel.advance()
+    advance_s = time.perf_counter() - t0
+
+    assert len(late) == expected, "some deadlines did not fire"
+    assert all(-1e-6 <= d <= wheel.tick + 1e-6 for d in late), \
+        f"a deadline fired early or late ({min(late)}, {max(late)})"
+
+    print(f"pending deadlines: {peak:,}")
+    print(f"schedule:  {schedule_s / peak * 1e6:.2f} us/op")
+    print(f"cancel:    {cancel_s / len(cancelled) * 1e6:.2f} us/op ({len(cancelled):,} cancelled)")
+    print(f"advance:   {ticks:,} ticks in {advance_s:.3f}s "
+          f"({advance_s / ticks * 1e6:.1f} us/tick, {expected:,} fired, max lateness {max(late) * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
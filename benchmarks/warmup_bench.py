@@ -0,0 +1,78 @@
+"""
+First-request latency after boot, with and without the warm-up.
+
+Each run starts a fresh interpreter, imports the API server (as a deploy
+would), optionally runs runtime.warmup, and then times the first
+create-session + start-level request for every game, followed by a second
+one as the steady-state reference. Runs are repeated and the medians
+reported.
+
+Usage:  python benchmarks/warmup_bench.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAMES = ("digitspan", "numerosity", "shapedance", "flashback", "pathfinder")
+
+
+def child(warm):
+    started = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    from api.server import GameServer
+    from runtime import warmup
+    result = {"import_ms": (time.perf_counter() - started) * 1000}
+    if warm:
+        warmup.warm_up()
+        result["warmup_ms"] = warmup.timings["total"] * 1000
+
+    server = GameServer()
+    for attempt in ("first", "second"):
+        for game in GAMES:
+            started = time.perf_counter()
+            _, body = server.dispatch("POST", "/sessions", {"game": game})
+            server.dispatch("POST", f"/sessions/{body['session_id']}/start", {})
+            result[f"{attempt}:{game}"] = (time.perf_counter() - started) * 1000
+    print(json.dumps(result))
+
+
+def run(warm):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", "warm" if warm else "cold"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=("cold", "warm"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child == "warm")
+        return
+
+    results = {mode: [run(mode == "warm") for _ in range(args.runs)] for mode in ("cold", "warm")}
+
+    def median(mode, key):
+        return statistics.median(r[key] for r in results[mode])
+
+    print(f"imports {median('cold', 'import_ms'):.0f} ms, warm-up {median('warm', 'warmup_ms'):.1f} ms "
+          f"(medians of {args.runs} fresh processes)")
+    print(f"{'game':>11} {'cold first':>11} {'warm first':>11} {'steady':>8}")
+    for game in GAMES:
+        print(f"{game:>11} {median('cold', 'first:' + game):>9.2f}ms {median('warm', 'first:' + game):>9.2f}ms "
+              f"{median('warm', 'second:' + game):>6.2f}ms")
+    cold = sum(median("cold", "first:" + game) for game in GAMES)
+    warm = sum(median("warm", "first:" + game) for game in GAMES)
+    print(f"{'all games':>11} {cold:>9.2f}ms {warm:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,5 @@ from .digitspan import DigitspanGame
 from .numerosity import NumerosityGame
 from .shapedance import ShapedanceGame
 from .flashback import FlashbackGame
-from .pathfinder import PathfinderGame
\ No newline at end of file
+from .pathfinder import PathfinderGame
+from .state import SessionState, transition
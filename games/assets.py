@@ -0,0 +1,46 @@
+"""
+Static stylesheet and SVG shape sprites shared by the games.
+
+The files in ``static/`` are served by Streamlit as a component, which gives
+them their real content type and ``Cache-Control: public``. The component's
+only job is to add the stylesheet to the page's <head> once per browser
+session; after that, reruns only send short class names.
+"""
+import os
+import time
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+STYLESHEET = "jobjitsu.v2.css"
+SPRITES = "shapes.v1.svg"
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+
+_static = components.declare_component("jobjitsu_static", path=STATIC_DIR)
+_countdown = components.declare_component(
+    "jobjitsu_countdown", path=os.path.join(STATIC_DIR, "countdown")
+)
+
+
+def use_stylesheet():
+    """
+    Loads the shared stylesheet into the page. The loader frame is rendered
+    only until it reports that the <link> is in place.
+    """
+    if st.session_state.get("_stylesheet_loaded"):
+        return
+    if _static(key="_stylesheet_loader", default=False):
+        st.session_state["_stylesheet_loaded"] = True
+
+
+def shape_html(shape: str, color: str, size: str = "sm") -> str:
+    """A sprite-backed shape; size is "sm" (40px) or "lg" (60px)."""
+    return f'<i class="jj-shape jj-{size} jj-{shape} jj-{color}"></i>'
+
+
+def countdown(deadline: float):
+    """
+    Shows a "Time Left" timer that counts down to ``deadline`` (a time.time()
+    value) in the browser, without rerunning the script.
+    """
+    _countdown(deadline=deadline, now=time.time(), key="_countdown", default=None)
@@ -1,11 +1,21 @@
 import random
 import time
 import streamlit as st
+from . import tables
+from .assets import countdown
+from .state import transition, record_created, battery_item
 
 class DigitspanGame:
-    def __init__(self):
-        if "digitspan" not in st.session_state:
-            st.session_state.digitspan = {
+    state_key = "digitspan"  # key of this game's dict in session state
+
+    def __init__(self, session_state=None, event_log=None, rng=None, battery=None, wakeup=None):
+        self.session_state = st.session_state if session_state is None else session_state
+        self.event_log = event_log
+        self.rng = random if rng is None else rng  # a random.Random for seed-locked content
+        self.battery = battery or {}                # pre-issued level content, see runtime.batteries
+        self.wakeup = wakeup                        # wakeup(name, deadline) -> bool, see runtime.timers
+        if "digitspan" not in self.session_state:
+            self.session_state.digitspan = {
                 "start_time": time.time(),
                 "total_time": 180,  # total time in seconds (adjust as needed)
                 "level": 1,
@@ -14,43 +24,56 @@ class DigitspanGame:
                 "current_sequence": "",
                 "result_message": "",
             }
-            st.session_state["input_answer"] = ""
+            record_created(self)
+            self.session_state["input_answer"] = ""
+
+    @staticmethod
+    def is_over(state):
+        """True once the game has ended: time ran out or the top level was passed."""
+        return time.time() >= state["start_time"] + state["total_time"] or state["level"] > 18
 
     def shuffle_string(self, s: str) -> str:
         chars = list(s)
-        random.shuffle(chars)
+        self.rng.shuffle(chars)
         return ''.join(chars)
 
-    def compute_difficulty(self):
+    def compute_difficulty(self, level=None):
         """
         Increases digit count every 3 levels.
         Level 1–3: 2 digits, 4–6: 3 digits, etc.
         Display time: 3.0, 2.0, 1.5 seconds respectively.
+        Uses the current level unless one is given.
         """
-        level = st.session_state.digitspan["level"]
-        digit_count = 2 + ((level - 1) // 3)
-        group_index = (level - 1) % 3
-        display_times = [3.0, 2.0, 1.5]
-        display_time = display_times[group_index]
-        return digit_count, display_time
+        if level is None:
+            level = self.session_state.digitspan["level"]
+        return tables.digitspan_difficulty(level)
+
+    def make_sequence(self, level: int) -> str:
+        """Generates a random sequence of the length the given level calls for."""
+        digit_count, _ = self.compute_difficulty(level)
+        return ''.join(self.rng.choices(self.shuffle_string("0123456789ABCDEFGHIJKLMNOPRSTUVYZ"), k=digit_count))
 
+    @transition
     def start_level(self):
-        """Generates a random sequence and sets the stage to display it."""
+        """Generates (or takes the pre-issued) sequence and sets the stage to display it."""
+        level = self.session_state.digitspan["level"]
         digit_count, display_time = self.compute_difficulty()
-        sequence = ''.join(random.choices(self.shuffle_string("0123456789ABCDEFGHIJKLMNOPRSTUVYZ"), k=digit_count))
-        st.session_state.digitspan.update({
+        sequence = battery_item(self, level) or self.make_sequence(level)
+        self.session_state.digitspan.update({
             "current_sequence": sequence,
             "stage": "show",
+            "shown_at": time.time(),
             "result_message": "",
             "digit_count": digit_count,
             "display_time": display_time
         })
-        st.session_state["input_answer"] = ""
+        self.session_state["input_answer"] = ""
 
+    @transition
     def check_answer(self):
         """Compares the user input with the generated sequence."""
-        state = st.session_state.digitspan
-        user_input = str(st.session_state.get("input_answer", "").strip())
+        state = self.session_state.digitspan
+        user_input = str(self.session_state.get("input_answer", "").strip())
         correct_sequence = str(state["current_sequence"])
         if user_input == correct_sequence:
             state["result_message"] = "Correct! Moving to the next level."
@@ -61,23 +84,29 @@ class DigitspanGame:
                 f"Incorrect! Your answer: {user_input}. Correct answer: {correct_sequence}. Try again."
             )
         state["stage"] = "init"
-        st.session_state["input_answer"] = ""
+        self.session_state["input_answer"] = ""
+
+    @transition
+    def hide_sequence(self):
+        """Ends the display stage; the player now types the sequence from memory."""
+        self.session_state.digitspan["stage"] = "input"
 
     def play(self):
-        state = st.session_state.digitspan
+        state = self.session_state.digitspan
         elapsed_time = time.time() - state["start_time"]
         time_left = state["total_time"] - elapsed_time
 
-        # Display the timer, level, and score.
-        st.write(f"**Time Left:** {int(time_left)} seconds")
-        st.write(f"**Level:** {state['level']} / 18  |  **Score:** {state['score']}")
-
         # If time is up or maximum level reached, end the game.
         if time_left <= 0 or state["level"] > 18:
+            st.write(f"**Level:** {state['level']} / 18  |  **Score:** {state['score']}")
             st.write("Time's up or maximum level reached!")
             st.write(f"**Final Score:** {state['score']}  |  Level: {state['level'] - 1}")
             return
 
+        # Display the timer (it counts down in the browser), level, and score.
+        countdown(state["start_time"] + state["total_time"])
+        st.write(f"**Level:** {state['level']} / 18  |  **Score:** {state['score']}")
+
         # Stage: init – waiting to start a level.
         if state["stage"] == "init":
             if st.button("Start Level", key="start_level", on_click=self.start_level):
@@ -85,22 +114,20 @@ class DigitspanGame:
             if state.get("result_message"):
                 st.write(state["result_message"])
 
-        # Stage: show – display the sequence for a fixed time.
+        # Stage: show – display the sequence until the timer wheel wakes us to hide it.
         elif state["stage"] == "show":
-            sequence_placeholder = st.empty()
-            sequence_placeholder.write(
-                f"**Sequence ({state['digit_count']} chars):** {state['current_sequence']}"
-            )
-            st.write(f"This sequence will be visible for {state['display_time']} seconds...")
-            time.sleep(state["display_time"])
-            sequence_placeholder.empty()
-            state["stage"] = "input"
+            hide_at = state["shown_at"] + state["display_time"]
+            if time.time() < hide_at:
+                st.write(f"**Sequence ({state['digit_count']} chars):** {state['current_sequence']}")
+                st.write(f"This sequence will be visible for {state['display_time']} seconds...")
+                if self.wakeup is None or not self.wakeup("stimulus_hide", hide_at):
+                    # Nothing can wake this session (no hook, or no Streamlit server); wait here instead.
+                    time.sleep(max(0, hide_at - time.time()))
+                    st.rerun()
+                return
+            self.hide_sequence()
 
         # Stage: input – allow the user to type in the sequence.
         if state["stage"] == "input":
             st.text_input("Enter the sequence:", key="input_answer", on_change=self.check_answer)
             st.write("Press Enter or click outside the box to submit.")
-
-        # Pause briefly and then re-run the script to update the timer.
-        time.sleep(1)
-        st.rerun()
@@ -0,0 +1,169 @@
+"""
+Exact-arithmetic expression solver for the mixed-operator Numerosity mode.
+
+``reachable`` is a bitmask subset DP: for every subset of the pool (up to
+``max_terms`` numbers) it memoizes the values that subset can produce with
++ − × ÷, and in how many ways. A subset's table is built from the tables of
+its two halves for every way of splitting it, so each sub-result is
+computed once no matter how many larger expressions reuse it. All values
+are Fractions, so ``6 / 4 * 2`` is exactly 3.
+
+Solutions are counted as distinct expression trees; a + b and b + a (and
+a × b, b × a) count once, since each split is only visited one way round.
+"""
+import ast
+from collections import defaultdict
+from fractions import Fraction
+
+
+def _exact(value):
+    """Keeps whole numbers as ints: int arithmetic is far cheaper than Fraction's."""
+    return value.numerator if type(value) is Fraction and value.denominator == 1 else value
+
+
+def _divide(a, b):
+    if type(a) is int and type(b) is int and a % b == 0:
+        return a // b
+    return _exact(Fraction(a) / b)
+
+
+def combine(a, b):
+    """Every value a and b can make with one operator, in both orders where it matters."""
+    yield a + b
+    yield a * b
+    yield a - b
+    yield b - a
+    if b:
+        yield _divide(a, b)
+    if a:
+        yield _divide(b, a)
+
+
+def _splits(mask):
+    """Each split of mask into two non-empty halves, once (the first half holds the lowest bit)."""
+    low = mask & -mask
+    sub = (mask - 1) & mask
+    while sub:
+        if sub & low:
+            yield sub, mask ^ sub
+        sub = (sub - 1) & mask
+
+
+def _masks(n, max_terms):
+    by_size = defaultdict(list)
+    for mask in range(1, 1 << n):
+        size = mask.bit_count()
+        if size <= max_terms:
+            by_size[size].append(mask)
+    return by_size
+
+
+def reachable(pool, max_terms):
+    """
+    Returns {mask: {value: count}} for every non-empty subset of ``pool``
+    with at most ``max_terms`` numbers. Bit i of a mask stands for pool[i].
+    Nothing is cached here: a 12-number pool's tables take over a megabyte,
+    so callers keep them only while they query that pool (see count_solutions).
+    """
+    memo = {1 << i: {number: 1} for i, number in enumerate(pool)}
+    by_size = _masks(len(pool), max_terms)
+    for size in range(2, max_terms + 1):
+        for mask in by_size[size]:
+            values = defaultdict(int)
+            for sub, rest in _splits(mask):
+                for a, count_a in memo[sub].items():
+                    for b, count_b in memo[rest].items():
+                        ways = count_a * count_b
+                        for value in combine(a, b):
+                            values[value] += ways
+            memo[mask] = dict(values)
+    return memo
+
+
+def _partners(values, target):
+    """
+    {y: ways} such that x op y == target (either order) for some x in
+    ``values``; whatever table y is looked up in, the ways multiply.
+    """
+    wanted = defaultdict(int)
+    for x, count_x in values.items():
+        wanted[target - x] += count_x          # x + y
+        wanted[x - target] += count_x          # x - y
+        wanted[x + target] += count_x          # y - x
+        if x:
+            wanted[_divide(target, x)] += count_x   # x * y
+            wanted[_divide(x, target)] += count_x   # x / y
+            wanted[target * x] += count_x           # y / x
+    return wanted
+
+
+def count_solutions(pool, target, max_terms, memo=None):
+    """
+    Number of expressions over at most ``max_terms`` numbers of ``pool``
+    (at least two) that evaluate exactly to ``target``, which must be
+    non-zero.
+
+    Subsets below ``max_terms`` come from the memoized DP. The largest
+    subsets are never tabulated: for each of their splits the smaller half
+    is turned (once per half, however many splits share it) into the
+    partner values the target requires, which are looked up in the larger
+    half's table.
+
+    ``memo`` is ``reachable(pool, max_terms - 1)``; pass it in to count
+    several targets on one pool without rebuilding it.
+    """
+    pool = tuple(pool)
+    target = _exact(Fraction(target))
+    if memo is None:
+        memo = reachable(pool, max_terms - 1)
+    total = sum(values.get(target, 0) for mask, values in memo.items() if mask & (mask - 1))
+    partners = {}
+    for mask in _masks(len(pool), max_terms)[max_terms] if max_terms > 1 else ():
+        for sub, rest in _splits(mask):
+            if len(memo[sub]) > len(memo[rest]):
+                sub, rest = rest, sub
+            if sub not in partners:
+                partners[sub] = _partners(memo[sub], target)
+            table = memo[rest]
+            total += sum(ways * table.get(y, 0) for y, ways in partners[sub].items())
+    return total
+
+
+# ---------- Player answers ---------- #
+
+_OPERATORS = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b,
+}
+
+
+def evaluate_expression(text):
+    """
+    Evaluates an arithmetic expression like "(12 - 4) * 3 / 2" exactly.
+    Returns (value, numbers_used). Raises ValueError for anything other than
+    integers, parentheses and + - * /, and for division by zero.
+    """
+    text = text.replace("×", "*").replace("÷", "/").replace("−", "-")
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError:
+        raise ValueError("That is not a valid expression.") from None
+
+    numbers = []
+
+    def visit(node):
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and type(node.value) is int:
+            numbers.append(node.value)
+            return Fraction(node.value)
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            left, right = visit(node.left), visit(node.right)
+            if isinstance(node.op, ast.Div) and right == 0:
+                raise ValueError("Division by zero.")
+            return _OPERATORS[type(node.op)](left, right)
+        raise ValueError("Use only numbers from the pool, parentheses and + - * /.")
+
+    return visit(tree), numbers
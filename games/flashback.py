@@ -1,90 +1,80 @@
 import time
 import streamlit as st
-import random
+from . import tables
+from .nback import NBackStream
+from .state import transition, record_created
 
 class FlashbackGame:
-    def __init__(self):
+    state_key = "flashback"  # key of this game's dict in session state
+
+    def __init__(self, session_state=None, n_back=1, match_rate=0.3, lure_rate=0.1, event_log=None, battery=None,
+                 wakeup=None):
+        self.session_state = st.session_state if session_state is None else session_state
+        self.event_log = event_log
+        self.wakeup = wakeup  # wakeup(name, deadline) -> bool, see runtime.timers
+        # A pre-issued battery fixes the stream's parameters and seed.
+        stream_spec = (battery or {}).get("flashback", {})
+        n_back = stream_spec.get("n", n_back)
+        match_rate = stream_spec.get("match_rate", match_rate)
+        lure_rate = stream_spec.get("lure_rate", lure_rate)
         # Initialize session state for flashback
-        if "flashback" not in st.session_state:
-            st.session_state.flashback = {
+        if "flashback" not in self.session_state:
+            self.session_state.flashback = {
                 "start_time": time.time(),  # game start time
                 "total_time": 180,           # total game time in seconds
                 "level": 1,                # initial level
                 "score": 0,                # initial score
                 "stage": "init",           # stages: init, display, input, gameover
+                "n_back": n_back,          # compare each shape with the one n_back rounds earlier
+                "stream": NBackStream(n_back, match_rate, lure_rate, seed=stream_spec.get("seed")),
+                "display_time": 2,         # seconds each shape stays visible
+                "shown_at": None,
                 "current_shape": None,
-                "shape_history": [],
                 "result_message": ""
             }
+            record_created(self)
             # Placeholder for user input (if needed later)
-            st.session_state["input_response"] = ""
+            self.session_state["input_response"] = ""
+
+    @staticmethod
+    def is_over(state):
+        """True once the game has ended: time ran out or a wrong answer ended it."""
+        return time.time() >= state["start_time"] + state["total_time"] or state["stage"] == "gameover"
 
+    @transition
     def generate_shape(self):
         """
-        Generates a random shape with a random color.
-        For now, we choose from circle, square, or triangle, with a single color.
+        Draws the next shape from the session's n-back stream.
+        The stream controls how often a shape repeats the one n rounds back,
+        instead of leaving matches to chance (about 1 in 18).
         """
-        shapes = ["circle", "square", "triangle"]
-        colors = ["red", "blue", "green", "orange", "purple", "yellow"]
-        shape = random.choice(shapes)
-        color = random.choice(colors)
-        
-        shape_info = {"shape": shape, "color": color}
-        st.session_state.flashback["current_shape"] = shape_info
-        st.session_state.flashback["shape_history"].append(shape_info)
+        shape_info = next(self.session_state.flashback["stream"])
+        self.session_state.flashback["current_shape"] = shape_info
     
     def get_shape_html(self, shape_info):
         """
         Returns an HTML snippet representing the given shape.
-        Uses inline CSS for simple styling.
+        Uses the shared SVG sprites and stylesheet classes.
         """
-        shape = shape_info["shape"]
-        color = shape_info["color"]
-        if shape == "circle":
-            style = (
-                f"width: 60px; height: 60px; "
-                f"background-color: {color}; border-radius: 50%; "
-                "display: inline-block;"
-            )
-        elif shape == "square":
-            style = (
-                f"width: 60px; height: 60px; "
-                f"background-color: {color}; "
-                "display: inline-block;"
-            )
-        elif shape == "triangle":
-            style = (
-                "width: 0; height: 0; "
-                "border-left: 30px solid transparent; "
-                "border-right: 30px solid transparent; "
-                f"border-bottom: 60px solid {color}; "
-                "display: inline-block;"
-            )
-        return f'<div style="{style}"></div>'
+        return tables.shape_fragment(shape_info["shape"], shape_info["color"], size="lg")
 
     def display_shape(self):
-        shape_info = st.session_state.flashback["current_shape"]
+        shape_info = self.session_state.flashback["current_shape"]
         if shape_info:
             html = self.get_shape_html(shape_info)
             st.markdown(html, unsafe_allow_html=True)
     
+    @transition
     def check_answer(self, user_choice: bool):
-        state = st.session_state.flashback
-        history = state["shape_history"]
-        # There should be at least 2 shapes when we compare
-        if len(history) < 2:
+        state = self.session_state.flashback
+        current_shape = state["current_shape"]
+        # The first n shapes have nothing n rounds back to compare with
+        if current_shape is None or not current_shape["scored"]:
             state["result_message"] = "Not enough shapes to compare"
             state["stage"] = "init"
             return
         
-        # Get the previous and current shapes
-        prev_shape = history[-2]
-        current_shape = history[-1]
-        
-        is_match = (prev_shape["shape"] == current_shape["shape"] and
-                    prev_shape["color"] == current_shape["color"])
-        
-        if user_choice == is_match:
+        if user_choice == current_shape["is_match"]:
             state["result_message"] = "Correct!!!!"
             state["score"] += 1
             state["level"] += 1
@@ -93,8 +83,22 @@ class FlashbackGame:
             state["result_message"] = "Incorrect !!!!"
             state["stage"] = "gameover"  # Stop game on wrong answer
     
+    @transition
+    def next_shape(self):
+        """Starts a round: draws the next shape and moves to the display stage."""
+        self.generate_shape()
+        self.session_state.flashback["shown_at"] = time.time()
+        self.session_state.flashback["stage"] = "display"
+        self.session_state.flashback["result_message"] = ""
+
+    @transition
+    def end_display(self):
+        """Hides the shape; asks for an answer only if there is a shape n rounds back."""
+        state = self.session_state.flashback
+        state["stage"] = "input" if state["current_shape"]["scored"] else "init"
+
     def play(self):
-        state = st.session_state.flashback
+        state = self.session_state.flashback
         
         # Calculate remaining time
         elapsed = time.time() - state["start_time"]
@@ -116,38 +120,33 @@ class FlashbackGame:
         
         # Stage: init - Waits to start a new round.
         if state["stage"] == "init":
-            # For the very first round, there is no previous shape
-            # So we generate one and remain in init to prime the game.
-            if len(state["shape_history"]) < 1:
-                if st.button("Show Next Shape", key="first_shape"):
-                    self.generate_shape()
-                    # Remain in init so that no comparison is attempted yet.
-                    state["result_message"] = ""
-                    st.rerun()
-            else:
-                # For subsequent rounds, generate the next shape and then move to display.
-                if st.button("Show Next Shape", key="next_shape"):
-                    self.generate_shape()
-                    state["stage"] = "display"
-                    state["result_message"] = ""
-                    st.rerun()
+            # The first n shapes only prime the game: they are shown, but the
+            # display stage sends them back to init since there is nothing to compare.
+            if st.button("Show Next Shape", key="next_shape"):
+                self.next_shape()
+                st.rerun()
         
         # Stage: display - Show the current shape briefly.
         elif state["stage"] == "display":
-            self.display_shape()
-            st.write("Memorize this shape....")
-            # Pause briefly (blocking call; in production, consider alternatives)
-            time.sleep(2)
-            # Move to input stage only if we have at least 2 shapes to compare.
-            if len(state["shape_history"]) < 2:
-                state["stage"] = "init"
-            else:
-                state["stage"] = "input"
+            hide_at = state["shown_at"] + state["display_time"]
+            if time.time() < hide_at:
+                self.display_shape()
+                st.write("Memorize this shape....")
+                # The timer wheel reruns the session when the shape should disappear.
+                if self.wakeup is None or not self.wakeup("stimulus_hide", hide_at):
+                    # Nothing can wake this session (no hook, or no Streamlit server); wait here instead.
+                    time.sleep(max(0, hide_at - time.time()))
+                    st.rerun()
+                return
+            self.end_display()
             st.rerun()
         
         # Stage: input - Ask the user for their response.
         elif state["stage"] == "input":
-            st.write("Do the last two shapes match?")
+            if state["n_back"] == 1:
+                st.write("Do the last two shapes match?")
+            else:
+                st.write(f"Does this shape match the one {state['n_back']} shapes back?")
             if st.button("Match", key="match_button"):
                 self.check_answer(True)
                 st.rerun()
@@ -0,0 +1,103 @@
+import random
+from collections import deque
+from itertools import islice
+
+SHAPES = ("circle", "square", "triangle")
+COLORS = ("red", "blue", "green", "orange", "purple", "yellow")
+
+
+class NBackStream:
+    """
+    Endless iterator of n-back stimuli with a controlled match and lure rate.
+
+    Each item is a dict with the shape, its color and whether it matches the
+    item n steps back ("is_match"). Lures are items that repeat the (n-1)- or
+    (n+1)-back stimulus without being a match, which is what makes n-back hard.
+    The first n items cannot be compared to anything and have "scored" False.
+
+    Only the last n + 1 stimuli are kept (the extra one is for n+1 lures), so
+    memory stays constant however long the session runs. Each item is drawn
+    from a generator seeded with (seed, index), so the whole stream state is
+    a handful of small values: cheap to store in session state, to pickle and
+    to log, and the same seed always gives the same sequence.
+    """
+
+    def __init__(self, n=1, match_rate=0.3, lure_rate=0.1,
+                 shapes=SHAPES, colors=COLORS, seed=None):
+        if not 1 <= n <= 4:
+            raise ValueError("n must be between 1 and 4")
+        if match_rate < 0 or lure_rate < 0 or match_rate + lure_rate > 1:
+            raise ValueError("match_rate and lure_rate must be >= 0 and sum to at most 1")
+        self.n = n
+        self.match_rate = match_rate
+        self.lure_rate = lure_rate
+        self.stimuli = [(s, c) for s in shapes for c in colors]
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.buffer = deque(maxlen=n + 1)
+        self.index = 0
+
+    def __iter__(self):
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, NBackStream):
+            return NotImplemented
+        return (
+            (self.n, self.match_rate, self.lure_rate, self.seed, self.index, self.stimuli, self.buffer)
+            == (other.n, other.match_rate, other.lure_rate, other.seed, other.index, other.stimuli, other.buffer)
+        )
+
+    def __next__(self):
+        rng = random.Random(f"{self.seed}:{self.index}")
+        is_match = is_lure = False
+        scored = len(self.buffer) >= self.n
+        if not scored:
+            stimulus = rng.choice(self.stimuli)
+        else:
+            target = self.buffer[-self.n]
+            roll = rng.random()
+            lures = self._lure_candidates(target)
+            if roll < self.match_rate:
+                stimulus, is_match = target, True
+            elif roll < self.match_rate + self.lure_rate and lures:
+                stimulus, is_lure = rng.choice(lures), True
+            else:
+                stimulus = self._pick_other(target, rng)
+
+        self.buffer.append(stimulus)
+        item = {
+            "shape": stimulus[0],
+            "color": stimulus[1],
+            "index": self.index,
+            "scored": scored,
+            "is_match": is_match,
+            "is_lure": is_lure,
+        }
+        self.index += 1
+        return item
+
+    def _lure_candidates(self, target):
+        candidates = []
+        if self.n >= 2:
+            candidates.append(self.buffer[-(self.n - 1)])
+        if len(self.buffer) > self.n:
+            candidates.append(self.buffer[-(self.n + 1)])
+        return [c for c in candidates if c != target]
+
+    def _pick_other(self, target, rng):
+        """A random stimulus that is neither the n-back target nor a lure."""
+        excluded = {target, *self._lure_candidates(target)}
+        while True:
+            stimulus = rng.choice(self.stimuli)
+            if stimulus not in excluded:
+                return stimulus
+
+    def take(self, count):
+        """Lazily yields the next ``count`` stimuli, e.g. a whole session's sequence."""
+        return islice(self, count)
+
+
+def nback_sequence(length, n=1, match_rate=0.3, lure_rate=0.1, seed=None):
+    """Generator over a pregenerated, optionally seed-locked session sequence."""
+    stream = NBackStream(n, match_rate, lure_rate, seed=seed)
+    yield from stream.take(length)
@@ -1,81 +1,167 @@
 import random
 import time
+from collections import Counter
 import streamlit as st
+from .assets import countdown
+from .expressions import combine, count_solutions, evaluate_expression, reachable
+from .state import transition, record_created, battery_item
 
 class NumerosityGame:
-    def __init__(self):
-        if "numerosity" not in st.session_state:
-            st.session_state.numerosity = {
+    state_key = "numerosity"  # key of this game's dict in session state
+
+    def __init__(self, session_state=None, event_log=None, rng=None, battery=None):
+        self.session_state = st.session_state if session_state is None else session_state
+        self.event_log = event_log
+        self.rng = random if rng is None else rng  # a random.Random for seed-locked content
+        self.battery = battery or {}                # pre-issued level content, see runtime.batteries
+        if "numerosity" not in self.session_state:
+            self.session_state.numerosity = {
                 "start_time": time.time(),
                 "total_time": 180,  # 3 minutes
                 "level": 1,
                 "score": 0,
                 "stage": "init",  # Can be "init" or "challenge"
+                "mode": "classic",  # "classic" (one operator, 3 numbers) or "mixed"
                 "operator": None,
+                "max_terms": 3,
+                "solutions": None,  # mixed mode: how many expressions reach the target
                 "target": None,
                 "pool": [],
                 "selected": [],
                 "result_message": ""
             }
+            record_created(self)
+
+    @staticmethod
+    def is_over(state):
+        """True once the game has ended: time ran out."""
+        return time.time() >= state["start_time"] + state["total_time"]
 
-    def generate_puzzle(self):
-        """Creates a new numerical puzzle and updates the session state."""
-        level = st.session_state.numerosity["level"]
+    def make_puzzle(self, level: int) -> dict:
+        """Creates a new numerical puzzle for the given level."""
         operators = ["+", "-", "*", "/"]
-        op = random.choice(operators)
-        st.session_state.numerosity["operator"] = op
+        op = self.rng.choice(operators)
 
         pool_size = 7 + level - 1
         number_range = (1, 20) if level < 3 else (1, 50)
 
         if op == "+":
-            a, b, c = [random.randint(*number_range) for _ in range(3)]
+            a, b, c = [self.rng.randint(*number_range) for _ in range(3)]
             target = a + b + c
         elif op == "-":
-            b = random.randint(*number_range)
-            c = random.randint(*number_range)
-            a = random.randint(b + c, b + c + (number_range[1] - number_range[0]))
+            b = self.rng.randint(*number_range)
+            c = self.rng.randint(*number_range)
+            a = self.rng.randint(b + c, b + c + (number_range[1] - number_range[0]))
             target = a - b - c
         elif op == "*":
-            a = random.randint(1, max(2, number_range[1] // 2))
-            b = random.randint(1, max(2, number_range[1] // 2))
-            c = random.randint(1, max(2, number_range[1] // 2))
+            a = self.rng.randint(1, max(2, number_range[1] // 2))
+            b = self.rng.randint(1, max(2, number_range[1] // 2))
+            c = self.rng.randint(1, max(2, number_range[1] // 2))
             target = a * b * c
         elif op == "/":
-            r = random.randint(1, 10)
-            b = random.randint(1, max(2, number_range[1] // 2))
-            c = random.randint(1, max(2, number_range[1] // 2))
+            r = self.rng.randint(1, 10)
+            b = self.rng.randint(1, max(2, number_range[1] // 2))
+            c = self.rng.randint(1, max(2, number_range[1] // 2))
             a = r * b * c
             target = int(a / b / c)
 
         valid_numbers = [a, b, c]
         pool = valid_numbers.copy()
         while len(pool) < pool_size:
-            pool.append(random.randint(*number_range))
-        random.shuffle(pool)
+            pool.append(self.rng.randint(*number_range))
+        self.rng.shuffle(pool)
+
+        return {"operator": op, "target": target, "pool": pool}
+
+    def make_mixed_puzzle(self, level: int) -> dict:
+        """
+        Creates a mixed-operator puzzle: reach the target with up to
+        ``max_terms`` numbers of the pool and any of + - * /, exactly.
+
+        The target is built from a random expression over the pool, so it is
+        always solvable; the solver then counts every way to reach it, and
+        targets with too many solutions for the level are redrawn (at most
+        eight are counted, keeping the hardest).
+        """
+        pool_size = min(12, 9 + level)
+        max_terms = 3 if level < 4 else 4
+        number_range = (1, 20) if level < 3 else (1, 50)
+        max_solutions = max(3, (24 if max_terms == 3 else 96) // level)
+        lowest = 10 if max_terms == 3 else 100  # small targets have hundreds of 4-number routes
+
+        pool = [self.rng.randint(*number_range) for _ in range(pool_size)]
+        memo = reachable(tuple(pool), max_terms - 1)  # shared by every target counted below, then dropped
+        best = None
+        checked = 0
+        for _ in range(50):
+            values = self.rng.sample(pool, max_terms)
+            while len(values) > 1:
+                a = values.pop(self.rng.randrange(len(values)))
+                b = values.pop(self.rng.randrange(len(values)))
+                values.append(self.rng.choice(list(combine(a, b))))
+            target = values[0]
+            if type(target) is not int or not lowest <= target <= 999 or target in pool:
+                continue
+            solutions = count_solutions(pool, target, max_terms, memo)
+            if best is None or solutions < best[1]:
+                best = (target, solutions)
+            checked += 1
+            if solutions <= max_solutions or checked == 8:
+                break
+        if best is None:  # no draw landed in range; settle for a plain sum
+            target = sum(pool[:max_terms])
+            best = (target, count_solutions(pool, target, max_terms, memo))
+
+        target, solutions = best
+        return {"operator": "mixed", "target": target, "pool": pool,
+                "max_terms": max_terms, "solutions": solutions}
 
-        st.session_state.numerosity.update({
-            "target": target,
-            "pool": pool,
+    @transition
+    def set_mode(self, mode):
+        """Switches between the classic and mixed-operator puzzles."""
+        if mode not in ("classic", "mixed"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.session_state.numerosity["mode"] = mode
+
+    @transition
+    def generate_puzzle(self, puzzle=None):
+        """
+        Sets up the next puzzle and updates the session state. The puzzle is
+        the one given (e.g. made off the API's event loop), pre-issued or new.
+        """
+        state = self.session_state.numerosity
+        level = state["level"]
+        if puzzle is None and state.get("mode") == "mixed":
+            puzzle = self.make_mixed_puzzle(level)  # batteries hold classic puzzles only
+        elif puzzle is None:
+            puzzle = battery_item(self, level) or self.make_puzzle(level)
+        state.update({
+            "operator": puzzle["operator"],
+            "target": puzzle["target"],
+            "pool": list(puzzle["pool"]),
+            "max_terms": puzzle.get("max_terms", 3),
+            "solutions": puzzle.get("solutions"),
             "selected": [],
             "result_message": "",
             "stage": "challenge"
         })
 
+    @transition
     def toggle_number(self, index):
         """Toggles selection status of a number in the pool."""
-        selected = st.session_state.numerosity["selected"]
+        selected = self.session_state.numerosity["selected"]
         if index in selected:
             selected.remove(index)
         else:
             if len(selected) < 3:
                 selected.append(index)
             else:
-                st.session_state.numerosity["result_message"] = "You can only select 3 numbers."
+                self.session_state.numerosity["result_message"] = "You can only select 3 numbers."
 
+    @transition
     def submit_answer(self):
         """Evaluates the selected numbers and checks if they produce the target result."""
-        state = st.session_state.numerosity
+        state = self.session_state.numerosity
         indices = state["selected"]
         if len(indices) != 3:
             state["result_message"] = "Please select exactly 3 numbers."
@@ -111,9 +197,41 @@ class NumerosityGame:
 
         state["stage"] = "init"
 
+    @transition
+    def submit_expression(self, text):
+        """Checks a typed mixed-operator expression against the pool and the target."""
+        state = self.session_state.numerosity
+        try:
+            value, numbers = evaluate_expression(text)
+        except ValueError as e:
+            state["result_message"] = f"⚠️ {e}"
+            return
+        if not 2 <= len(numbers) <= state["max_terms"]:
+            state["result_message"] = f"⚠️ Use between 2 and {state['max_terms']} numbers."
+            return
+        if Counter(numbers) - Counter(state["pool"]):
+            state["result_message"] = "⚠️ Use only numbers from the pool, each at most as often as it appears."
+            return
+
+        if value == state["target"]:
+            state["result_message"] = "✅ Correct!"
+            state["score"] += 1
+            state["level"] += 1
+        else:
+            state["result_message"] = (
+                f"❌ Incorrect! {text} = {value}, but the target was {state['target']}."
+            )
+
+        state["stage"] = "init"
+
+    def _submit_typed(self):
+        """Button callback: submits the expression box and clears it."""
+        self.submit_expression(st.session_state.get("numerosity_expression", ""))
+        st.session_state.numerosity_expression = ""
+
     def play(self):
         """Controls game flow: timer, levels, and user interaction."""
-        state = st.session_state.numerosity
+        state = self.session_state.numerosity
         elapsed = time.time() - state["start_time"]
         remaining = int(state["total_time"] - elapsed)
 
@@ -122,24 +240,34 @@ class NumerosityGame:
             st.success(f"Final Score: {state['score']}")
             return
 
-        st.markdown(
-            f"""
-            <div style='position:fixed; top:10px; right:20px;
-                        background-color:#f0f0f0; padding:10px 20px;
-                        border-radius:10px; border:1px solid #ddd;
-                        font-weight:bold; font-size:18px; z-index:1000;'>
-                ⏰ Time Left: {remaining} seconds
-            </div>
-            """, unsafe_allow_html=True
-        )
+        # Live timer; it counts down in the browser, and the timer wheel
+        # reruns the session when the game ends.
+        countdown(state["start_time"] + state["total_time"])
 
         st.write(f"**Level:** {state['level']}  |  **Score:** {state['score']}")
 
         if state["stage"] == "init":
+            modes = {"classic": "Classic", "mixed": "Mixed operators"}
+            mode = st.radio("Mode", list(modes), format_func=modes.get, horizontal=True,
+                            index=list(modes).index(state.get("mode", "classic")))
+            if mode != state.get("mode", "classic"):
+                self.set_mode(mode)
             st.button("Start New Puzzle", key="new_puzzle", on_click=self.generate_puzzle)
             if state.get("result_message"):
                 st.write(state["result_message"])
 
+        elif state["stage"] == "challenge" and state.get("mode") == "mixed":
+            st.write(f"**Target Result:** {state['target']}")
+            st.write(f"Use up to {state['max_terms']} numbers with + - * / and parentheses "
+                     f"({state['solutions']} possible expressions).")
+            st.write("### Number Pool:")
+            st.write("  ".join(f"`{num}`" for num in state["pool"]))
+            st.text_input("Expression", key="numerosity_expression", placeholder="(12 - 4) * 3 / 2")
+            st.button("Submit Answer", key="submit", on_click=self._submit_typed)
+
+            if state.get("result_message"):
+                st.write(state["result_message"])
+
         elif state["stage"] == "challenge":
             st.write(f"**Operation:** {state['operator']}")
             st.write(f"**Target Result:** {state['target']}")
@@ -155,7 +283,3 @@ class NumerosityGame:
 
             if state.get("result_message"):
                 st.write(state["result_message"])
-
-        # Auto-refresh for live timer
-        time.sleep(1)
-        st.rerun()
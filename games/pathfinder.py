@@ -1,60 +1,89 @@
 import time
 import streamlit as st
 import random
+from . import tables
+from .state import transition, record_created, battery_item
+from .tileboard import GLYPHS, MAX_SIZE, Connectivity, generate_board, piece_type
 
 class PathfinderGame:
-    def __init__(self):
+    state_key = "pathfinder"  # key of this game's dict in session state
+
+    def __init__(self, session_state=None, event_log=None, rng=None, battery=None):
+        self.session_state = st.session_state if session_state is None else session_state
+        self.event_log = event_log
+        self.rng = random if rng is None else rng  # a random.Random for seed-locked content
+        self.battery = battery or {}                # pre-issued level content, see runtime.batteries
         # Initialize session state for Pathfinder if not already set.
-        if "pathfinder" not in st.session_state:
-            st.session_state.pathfinder = {
+        if "pathfinder" not in self.session_state:
+            self.session_state.pathfinder = {
                 "start_time": time.time(),   # Game start time
                 "total_time": 300,           # Total game time in seconds (5 minutes)
                 "score": 0,                  # Starting score
                 "level": 1,                  # Starting level (or puzzle number)
                 "stage": "init",             # Game stages: init, puzzle, gameover
+                "mode": "reorder",           # "reorder" (1D piece order) or "board" (2D tile rotation)
                 "current_puzzle": None,      # Placeholder for the current puzzle's road pieces
+                "board": None,               # Board mode: see games.tileboard
+                "moves": 0,                  # Board mode: rotations on the current board
                 "result_message": ""         # Placeholder for feedback messages
             }
+            record_created(self)
 
-    def generate_puzzle(self):
+    @staticmethod
+    def is_over(state):
+        """True once the game has ended: time ran out."""
+        return time.time() >= state["start_time"] + state["total_time"]
+
+    def make_puzzle(self) -> dict:
         """
-        Generates a puzzle by selecting a template from multiple templates and then scrambling the order.
+        Generates a puzzle by selecting one of the shared templates and then scrambling the order.
+        The pieces are new dicts, so nothing in the puzzle is shared with the table or other sessions.
         """
-        puzzle_templates = [
-            [
-                {"id": 1, "type": "endpoint", "open_edges": ["right"]},
-                {"id": 2, "type": "straight", "open_edges": ["left", "right"]},
-                {"id": 3, "type": "straight", "open_edges": ["left", "right"]},
-                {"id": 4, "type": "endpoint", "open_edges": ["left"]}
-            ],
-            [
-                {"id": 5, "type": "endpoint", "open_edges": ["down"]},
-                {"id": 6, "type": "corner", "open_edges": ["up", "right"]},
-                {"id": 7, "type": "straight", "open_edges": ["left", "right"]},
-                {"id": 8, "type": "endpoint", "open_edges": ["left"]}
-            ],
-            [
-                {"id": 9, "type": "corner", "open_edges": ["up", "left"]},
-                {"id": 10, "type": "straight", "open_edges": ["up", "down"]},
-                {"id": 11, "type": "corner", "open_edges": ["down", "right"]}
-            ]
+        template = self.rng.choice(tables.get().pathfinder_templates)
+        correct_order = [
+            {"id": piece_id, "type": kind, "open_edges": list(open_edges)}
+            for piece_id, kind, open_edges in template
         ]
-        
-        correct_order = random.choice(puzzle_templates)
         scrambled_order = correct_order.copy()
-        random.shuffle(scrambled_order)
+        self.rng.shuffle(scrambled_order)
         
-        st.session_state.pathfinder["current_puzzle"] = {
+        return {
             "correct_order": correct_order,
             "scrambled_order": scrambled_order
         }
+
+    def make_board(self, level: int) -> dict:
+        """A scrambled tile board; it grows with the level up to 15x15."""
+        return generate_board(min(MAX_SIZE, 2 + level), self.rng)
+
+    @transition
+    def set_mode(self, mode):
+        """Switches between reordering pieces and rotating tiles on a board."""
+        if mode not in ("reorder", "board"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.session_state.pathfinder["mode"] = mode
+
+    @transition
+    def generate_puzzle(self):
+        """Sets up the next puzzle, pre-issued or freshly generated."""
+        level = self.session_state.pathfinder["level"]
+        if self.session_state.pathfinder.get("mode") == "board":
+            # Batteries hold reorder puzzles only.
+            self.session_state.pathfinder["board"] = self.make_board(level)
+            self.session_state.pathfinder["moves"] = 0
+            return
+        puzzle = battery_item(self, level) or self.make_puzzle()
+        self.session_state.pathfinder["current_puzzle"] = {
+            "correct_order": list(puzzle["correct_order"]),
+            "scrambled_order": list(puzzle["scrambled_order"])
+        }
     
     def display_reorder_ui(self):
         """
         Displays the scrambled puzzle pieces with options to move them.
         Each piece is displayed in a horizontal row with left/right buttons.
         """
-        puzzle = st.session_state.pathfinder.get("current_puzzle")
+        puzzle = self.session_state.pathfinder.get("current_puzzle")
         if not puzzle:
             st.write("No puzzle available.")
             return
@@ -78,11 +107,64 @@ class PathfinderGame:
                     self.move_piece(idx, "right")
                     st.rerun()
     
+    def connectivity(self):
+        """
+        The board's Connectivity, kept in session state next to the game's
+        own state so that each rotation only updates it. It is rebuilt when
+        the board is new or was restored from the event log.
+        """
+        board = self.session_state.pathfinder["board"]
+        links = self.session_state.get("pathfinder_links")
+        if links is None or links.tiles is not board["tiles"]:
+            links = Connectivity(board)
+            self.session_state["pathfinder_links"] = links
+        return links
+
+    @transition
+    def rotate_tile(self, index):
+        """Rotates a board tile a quarter turn clockwise; connecting start to goal solves the board."""
+        state = self.session_state.pathfinder
+        if state["stage"] != "puzzle":
+            return  # a click queued before the board was solved
+        links = self.connectivity()
+        links.rotate(index)
+        state["moves"] += 1
+        if links.solved():
+            state["result_message"] = f"Connected in {state['moves']} moves!"
+            state["score"] += 1
+            state["level"] += 1
+            state["stage"] = "init"
+
+    def display_board_ui(self):
+        """
+        Displays the board as a grid of tile buttons; clicking one rotates it.
+        Tiles linked to the start are highlighted.
+        """
+        board = self.session_state.pathfinder["board"]
+        size, tiles = board["size"], board["tiles"]
+        reached = self.connectivity().component(board["start"])
+
+        st.markdown('<span class="jj-board"></span>', unsafe_allow_html=True)
+        st.write("### Rotate the tiles to connect 🚩 to 🏁")
+        for row in range(size):
+            cols = st.columns(size)
+            for col in range(size):
+                idx = row * size + col
+                label = GLYPHS[tiles[idx]]
+                if idx == board["start"]:
+                    label = "🚩" + label
+                elif idx == board["goal"]:
+                    label = "🏁" + label
+                cols[col].button(label, key=f"pathfinder_tile_{idx}", on_click=self.rotate_tile, args=(idx,),
+                                 help=piece_type(tiles[idx]).capitalize(),
+                                 type="primary" if idx in reached else "secondary")
+
+    @transition
     def move_piece(self, index, direction):
         """
         Moves a puzzle piece left or right in the scrambled order.
         """
-        puzzle = st.session_state.pathfinder["current_puzzle"]
+        puzzle = self.session_state.pathfinder["current_puzzle"]
         order = puzzle["scrambled_order"]
         if direction == "left" and index > 0:
             # Swap with the piece on the left
@@ -91,51 +173,43 @@ class PathfinderGame:
             # Swap with the piece on the right
             order[index], order[index + 1] = order[index + 1], order[index]
         puzzle["scrambled_order"] = order
-        st.session_state.pathfinder["current_puzzle"] = puzzle
+        self.session_state.pathfinder["current_puzzle"] = puzzle
     
+    @transition
     def check_solution(self):
         """
         Checks if the current scrambled order matches the correct order.
         Comparison is based on the sequence of piece IDs.
         """
-        puzzle = st.session_state.pathfinder.get("current_puzzle")
+        puzzle = self.session_state.pathfinder.get("current_puzzle")
         if not puzzle:
-            st.session_state.pathfinder["result_message"] = "No puzzle to check."
+            self.session_state.pathfinder["result_message"] = "No puzzle to check."
             return
         
         correct = [piece["id"] for piece in puzzle["correct_order"]]
         current = [piece["id"] for piece in puzzle["scrambled_order"]]
         
         if current == correct:
-            st.session_state.pathfinder["result_message"] = "Correct!"
-            st.session_state.pathfinder["score"] += 1
-            st.session_state.pathfinder["level"] += 1
+            self.session_state.pathfinder["result_message"] = "Correct!"
+            self.session_state.pathfinder["score"] += 1
+            self.session_state.pathfinder["level"] += 1
         else:
-            st.session_state.pathfinder["result_message"] = "Incorrect."
+            self.session_state.pathfinder["result_message"] = "Incorrect."
         # Prepare for the next puzzle
-        st.session_state.pathfinder["stage"] = "init"
+        self.session_state.pathfinder["stage"] = "init"
     
+    @transition
+    def new_puzzle(self):
+        """Generates a puzzle and moves to the puzzle stage."""
+        self.generate_puzzle()
+        self.session_state.pathfinder["stage"] = "puzzle"
+        self.session_state.pathfinder["result_message"] = ""
+
     def play(self):
-        state = st.session_state.pathfinder
-
-        # CSS Styling for a better look
-        st.markdown(
-            """
-            <style>
-            h3, h4 {
-                color: #FF9900;
-            }
-            .stButton button {
-                background-color: #4F2E82;
-                color: white;
-                font-weight: bold;
-                border-radius: 6px;
-                padding: 0.5em 1em;
-            }
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
+        state = self.session_state.pathfinder
+
+        # Marker that switches on the Pathfinder theme in the shared stylesheet
+        st.markdown('<span class="jj-pathfinder"></span>', unsafe_allow_html=True)
 
         # Calculate remaining time
         elapsed = time.time() - state["start_time"]
@@ -151,12 +225,20 @@ class PathfinderGame:
 
         # Stage: init - waiting to generate a new puzzle
         if state["stage"] == "init":
+            modes = {"reorder": "Reorder pieces", "board": "Rotate tiles"}
+            mode = st.radio("Mode", list(modes), format_func=modes.get, horizontal=True,
+                            index=list(modes).index(state.get("mode", "reorder")))
+            if mode != state.get("mode", "reorder"):
+                self.set_mode(mode)
             if st.button("Generate New Puzzle", key="pathfinder_generate"):
-                self.generate_puzzle()
-                state["stage"] = "puzzle"
-                state["result_message"] = ""
+                self.new_puzzle()
                 st.rerun()
 
+        # Stage: puzzle - board mode, rotate tiles until start reaches goal
+        elif state["stage"] == "puzzle" and state.get("mode") == "board":
+            self.display_board_ui()
+            st.write(f"**Moves:** {state['moves']}")
+
         # Stage: puzzle - display the puzzle reordering UI
         elif state["stage"] == "puzzle":
             self.display_reorder_ui()
@@ -2,6 +2,8 @@ import random
 import time
 import math
 import streamlit as st
+from . import tables
+from .state import transition, record_created, battery_item
 
 
 # ---------- Utility Functions for HTML & CSS ---------- #
@@ -9,34 +11,9 @@ import streamlit as st
 def generate_shape_html(shape: str, color: str) -> str:
     """
     Returns an HTML snippet representing a shape (circle, square, triangle)
-    in a given color.
+    in a given color, as a reference to the shared SVG sprite sheet.
     """
-    if shape == "circle":
-        style = (
-            "width: 40px; "
-            "height: 40px; "
-            f"background-color: {color}; "
-            "border-radius: 50%; "
-            "display: inline-block;"
-        )
-    elif shape == "square":
-        style = (
-            "width: 40px; "
-            "height: 40px; "
-            f"background-color: {color}; "
-            "display: inline-block;"
-        )
-    elif shape == "triangle":
-        # Create an upward-pointing triangle using borders.
-        style = (
-            "width: 0; "
-            "height: 0; "
-            "border-left: 20px solid transparent; "
-            "border-right: 20px solid transparent; "
-            f"border-bottom: 40px solid {color}; "
-            "display: inline-block;"
-        )
-    return f'<div style="{style}"></div>'
+    return tables.shape_fragment(shape, color, size="sm")
 
 
 def create_cube_html(pattern: list, selected: bool = False, transform: tuple = None) -> str:
@@ -45,6 +22,8 @@ def create_cube_html(pattern: list, selected: bool = False, transform: tuple = N
     The pattern is arranged in a square grid based on the number of symbols.
     Applies a stored transformation (rotation and mirror) if provided.
     Adds a green border if the cube is selected.
+    Static styling comes from the shared stylesheet; only the per-cube
+    transform is inline.
     """
     # Use the provided transformation or default to no rotation/mirror.
     if transform is not None:
@@ -55,43 +34,34 @@ def create_cube_html(pattern: list, selected: bool = False, transform: tuple = N
     else:
         transform_str = "rotate(0deg)"
 
-    extra_style = "border: 4px solid green;" if selected else ""
+    cube_class = "jj-cube jj-cube-selected" if selected else "jj-cube"
 
     # Compute grid dimensions: number of columns is the ceiling of the square root of number of symbols.
     grid_size = math.ceil(math.sqrt(len(pattern)))
-    # Build the grid container for symbols.
-    grid_container_style = (
-        f"display: grid; grid-template-columns: repeat({grid_size}, 1fr); "
-        "grid-gap: 4px; justify-items: center; align-items: center;"
-    )
-    grid_html = f'<div style="{grid_container_style}">'
+    if grid_size <= 6:
+        grid_html = f'<div class="jj-grid jj-grid-{grid_size}">'
+    else:
+        grid_html = f'<div class="jj-grid" style="grid-template-columns: repeat({grid_size}, 1fr)">'
     for (s, c) in pattern:
         grid_html += generate_shape_html(s, c)
     grid_html += "</div>"
 
-    # Build the overall cube container style.
-    container_style = (
-        "display: inline-block; "
-        "background-color: #4F2E82; "
-        "border-radius: 8px; "
-        "padding: 16px; "
-        "margin: 8px; "
-        "overflow: visible; "  # Ensure shapes aren't clipped.
-        f"{extra_style} "
-        f"transform: {transform_str}; "
-        "transition: transform 1s;"
-    )
-
-    html = f'<div style="{container_style}">{grid_html}</div>'
+    html = f'<div class="{cube_class}" style="transform: {transform_str}">{grid_html}</div>'
     return html
 
 
 # ---------- Main ShapedanceGame Class ---------- #
 
 class ShapedanceGame:
-    def __init__(self):
-        if "shapedance" not in st.session_state:
-            st.session_state.shapedance = {
+    state_key = "shapedance"  # key of this game's dict in session state
+
+    def __init__(self, session_state=None, event_log=None, rng=None, battery=None):
+        self.session_state = st.session_state if session_state is None else session_state
+        self.event_log = event_log
+        self.rng = random if rng is None else rng  # a random.Random for seed-locked content
+        self.battery = battery or {}                # pre-issued level content, see runtime.batteries
+        if "shapedance" not in self.session_state:
+            self.session_state.shapedance = {
                 "start_time": time.time(),
                 "total_time": 180,  # 3 minutes total game time (in seconds)
                 "level": 1,
@@ -105,17 +75,22 @@ class ShapedanceGame:
                 "pattern_length": 0,
                 "selected": []  # List to track currently selected cube indices
             }
+            record_created(self)
+
+    @staticmethod
+    def is_over(state):
+        """True once the game has ended: time ran out."""
+        return time.time() >= state["start_time"] + state["total_time"]
 
-    def compute_difficulty(self):
+    def compute_difficulty(self, level=None):
         """
-        Adjust difficulty based on current level:
+        Adjust difficulty based on current level (or the given one):
           - Increases pattern length every 3 levels.
           - Increases number of cubes (4, 6, 8, …).
         """
-        level = st.session_state.shapedance["level"]
-        pattern_length = 2 + ((level - 1) // 3)
-        num_cubes = 4 + 2 * ((level - 1) // 3)
-        return pattern_length, num_cubes
+        if level is None:
+            level = self.session_state.shapedance["level"]
+        return tables.shapedance_difficulty(level)
 
     def generate_pattern(self, length: int) -> list:
         """
@@ -125,24 +100,24 @@ class ShapedanceGame:
         colors = ["red", "orange", "yellow", "green", "blue", "purple"]
         pattern = []
         for _ in range(length):
-            shape = random.choice(shapes)
-            color = random.choice(colors)
+            shape = self.rng.choice(shapes)
+            color = self.rng.choice(colors)
             pattern.append((shape, color))
         return pattern
 
-    def start_level(self):
+    def make_level(self, level: int) -> dict:
         """
-        Sets up a new level by generating cube patterns.
+        Generates the cube patterns for a level.
         Exactly two cubes will have the same pattern.
         Also creates a list of transformation parameters (rotation, mirror)
         for each cube.
         """
-        pattern_length, num_cubes = self.compute_difficulty()
+        pattern_length, num_cubes = self.compute_difficulty(level)
         matching_pattern = self.generate_pattern(pattern_length)
 
         # Randomly choose two distinct indices for the matching pair.
         indices = list(range(num_cubes))
-        matching_pair = sorted(random.sample(indices, 2))
+        matching_pair = sorted(self.rng.sample(indices, 2))
 
         patterns = []
         for i in range(num_cubes):
@@ -157,28 +132,38 @@ class ShapedanceGame:
         # Generate random transformation parameters for each cube.
         transformations = []
         for _ in range(num_cubes):
-            rotation = random.randint(-180, 180)  # Rotation angle in degrees.
-            mirror = random.choice([True, False])  # Randomly mirror horizontally.
+            rotation = self.rng.randint(-180, 180)  # Rotation angle in degrees.
+            mirror = self.rng.choice([True, False])  # Randomly mirror horizontally.
             transformations.append((rotation, mirror))
 
-        st.session_state.shapedance.update({
+        return {
             "current_patterns": patterns,
             "matching_pair": matching_pair,
             "transformations": transformations,
-            "stage": "active",
-            "result_message": "",
             "num_cubes": num_cubes,
             "pattern_length": pattern_length,
+        }
+
+    @transition
+    def start_level(self):
+        """Sets up a new level, pre-issued or freshly generated."""
+        level = self.session_state.shapedance["level"]
+        content = battery_item(self, level) or self.make_level(level)
+        self.session_state.shapedance.update(content)
+        self.session_state.shapedance.update({
+            "stage": "active",
+            "result_message": "",
             "selected": []
         })
 
+    @transition
     def toggle_selection(self, index):
         """
         Toggle the selection state of the cube with the given index.
         If a cube is already selected, clicking it again will deselect it.
         Once exactly two cubes are selected, check the answer.
         """
-        state = st.session_state.shapedance
+        state = self.session_state.shapedance
         selected = state.get("selected", [])
         if index in selected:
             selected.remove(index)
@@ -190,13 +175,14 @@ class ShapedanceGame:
         if len(selected) == 2:
             self.check_answer()
 
+    @transition
     def check_answer(self):
         """
         Checks whether the two selected cubes match.
         If correct, the score and level are updated and a new level begins.
         Otherwise, an error message is displayed and the selection is reset.
         """
-        state = st.session_state.shapedance
+        state = self.session_state.shapedance
         selected = sorted(state.get("selected", []))
         if selected == state["matching_pair"]:
             state["result_message"] = "Correct! Moving to the next level."
@@ -216,7 +202,7 @@ class ShapedanceGame:
           - Displays the time left, level, and score.
           - Renders the current level's cubes (always visible) so the player can click to select/deselect.
         """
-        state = st.session_state.shapedance
+        state = self.session_state.shapedance
         elapsed_time = time.time() - state["start_time"]
         time_left = state["total_time"] - elapsed_time
 
@@ -0,0 +1,58 @@
+import functools
+
+
+class SessionState(dict):
+    """
+    A plain dict with attribute access, mirroring the parts of
+    st.session_state the games rely on. Lets the game classes run outside
+    a Streamlit script (e.g. behind the JSON API).
+    """
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+
+def transition(method):
+    """
+    Marks a game method as a state transition. When the game has an event
+    log, whatever the method changed in the game's state dict is appended to
+    the log as one event once the outermost transition returns.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        log = getattr(self, "event_log", None)
+        if log is None or getattr(self, "_in_transition", False):
+            return method(self, *args, **kwargs)
+        self._in_transition = True
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._in_transition = False
+            log.sync(self.state_key, self.session_state[self.state_key], method.__name__, args)
+    return wrapper
+
+
+def battery_item(game, level):
+    """The pre-issued content for ``level`` of this game, or None to generate it."""
+    items = getattr(game, "battery", {}).get(game.state_key)
+    if items and 1 <= level <= len(items):
+        return items[level - 1]
+    return None
+
+
+def record_created(game):
+    """Logs a freshly initialised game state dict as the game's first event."""
+    if getattr(game, "event_log", None) is not None:
+        game.event_log.sync(game.state_key, game.session_state[game.state_key], "created")
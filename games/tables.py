@@ -0,0 +1,100 @@
+"""
+Immutable lookup tables shared by every session in the process.
+
+The per-level difficulty schedules, Pathfinder's piece templates and the
+pre-rendered shape sprites are built once (by runtime.warmup at boot, or by
+whichever session asks first) and then only read, so all sessions share
+one copy without locks. Everything in them is immutable: Pathfinder's
+template pieces are (id, type, open_edges) tuples, and make_puzzle builds
+fresh dicts from them for each puzzle, since those end up in game state.
+"""
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+from .assets import shape_html
+from .nback import COLORS, SHAPES
+
+LEVELS = 60  # levels covered by the difficulty tables; higher ones are computed on demand
+SIZES = ("sm", "lg")
+
+Tables = namedtuple("Tables", "digitspan shapedance pathfinder_templates shapes")
+
+_tables = None
+_lock = threading.Lock()
+
+
+# ---------- Difficulty schedules ---------- #
+
+def _digitspan_difficulty(level):
+    """(digit_count, display_time): one more digit every 3 levels, shown for 3.0, 2.0, 1.5 s."""
+    return 2 + (level - 1) // 3, (3.0, 2.0, 1.5)[(level - 1) % 3]
+
+
+def _shapedance_difficulty(level):
+    """(pattern_length, num_cubes): both grow every 3 levels."""
+    return 2 + (level - 1) // 3, 4 + 2 * ((level - 1) // 3)
+
+
+def _pathfinder_templates():
+    """Each template's pieces as (id, type, open_edges) tuples."""
+    return (
+        (
+            (1, "endpoint", ("right",)),
+            (2, "straight", ("left", "right")),
+            (3, "straight", ("left", "right")),
+            (4, "endpoint", ("left",)),
+        ),
+        (
+            (5, "endpoint", ("down",)),
+            (6, "corner", ("up", "right")),
+            (7, "straight", ("left", "right")),
+            (8, "endpoint", ("left",)),
+        ),
+        (
+            (9, "corner", ("up", "left")),
+            (10, "straight", ("up", "down")),
+            (11, "corner", ("down", "right")),
+        ),
+    )
+
+
+def build():
+    """Builds every table. Cheap enough to call again, but get() caches the result."""
+    levels = range(1, LEVELS + 1)
+    return Tables(
+        digitspan=tuple(_digitspan_difficulty(level) for level in levels),
+        shapedance=tuple(_shapedance_difficulty(level) for level in levels),
+        pathfinder_templates=_pathfinder_templates(),
+        shapes=MappingProxyType({
+            (shape, color, size): shape_html(shape, color, size)
+            for shape in SHAPES for color in COLORS for size in SIZES
+        }),
+    )
+
+
+def get():
+    """The process-wide tables, built on first use."""
+    global _tables
+    if _tables is None:
+        with _lock:
+            if _tables is None:
+                _tables = build()
+    return _tables
+
+
+# ---------- Readers ---------- #
+
+def digitspan_difficulty(level):
+    table = get().digitspan
+    return table[level - 1] if 1 <= level <= len(table) else _digitspan_difficulty(level)
+
+
+def shapedance_difficulty(level):
+    table = get().shapedance
+    return table[level - 1] if 1 <= level <= len(table) else _shapedance_difficulty(level)
+
+
+def shape_fragment(shape, color, size="sm"):
+    """Pre-rendered sprite markup; falls back to rendering unknown combinations."""
+    return get().shapes.get((shape, color, size)) or shape_html(shape, color, size)
@@ -0,0 +1,240 @@
+"""
+Tile-rotation boards for Pathfinder's board mode.
+
+A board is a JSON-safe dict, so it can live in session state and the event
+log like the rest of a game's state:
+
+    {"size": n, "tiles": [mask, ...], "start": index, "goal": index}
+
+``tiles`` is row-major, and each tile is a 4-bit mask of the edges it opens
+(N=1, E=2, S=4, W=8). One edge is an endpoint, two opposite edges a
+straight, two adjacent edges a corner and three edges a tee. Two
+neighbouring tiles are linked when both open towards each other; the board
+is solved when start and goal are in the same linked component.
+"""
+import random
+from collections import deque
+
+N, E, S, W = 1, 2, 4, 8
+EDGES = (N, E, S, W)
+OPPOSITE = {N: S, E: W, S: N, W: E}
+MAX_SIZE = 15
+
+# Box-drawing glyph for each edge mask.
+GLYPHS = {
+    N: "╵", E: "╶", S: "╷", W: "╴",
+    N | S: "│", E | W: "─",
+    N | E: "└", E | S: "┌", S | W: "┐", N | W: "┘",
+    N | E | S: "├", E | S | W: "┬", N | S | W: "┤", N | E | W: "┴",
+}
+
+
+def rotate(mask: int, turns: int = 1) -> int:
+    """The mask after ``turns`` quarter turns clockwise."""
+    turns %= 4
+    return ((mask << turns) | (mask >> (4 - turns))) & 0b1111
+
+
+def piece_type(mask: int) -> str:
+    """The tile's kind: "endpoint", "straight", "corner" or "tee"."""
+    edges = mask.bit_count()
+    if edges == 1:
+        return "endpoint"
+    if edges == 3:
+        return "tee"
+    return "straight" if mask in (N | S, E | W) else "corner"
+
+
+def neighbour(size: int, index: int, edge: int):
+    """Index of the tile across ``edge``, or None at the border."""
+    row, col = divmod(index, size)
+    if edge == N:
+        return index - size if row > 0 else None
+    if edge == S:
+        return index + size if row < size - 1 else None
+    if edge == W:
+        return index - 1 if col > 0 else None
+    return index + 1 if col < size - 1 else None
+
+
+def linked(size, tiles, index):
+    """Neighbours that ``index`` is linked to with the tiles as they are now."""
+    mask = tiles[index]
+    for edge in EDGES:
+        if mask & edge:
+            other = neighbour(size, index, edge)
+            if other is not None and tiles[other] & OPPOSITE[edge]:
+                yield other
+
+
+# ---------- Generation ---------- #
+
+def _spanning_tree(size, rng):
+    """
+    Edge masks of a random spanning tree of the grid (randomised Prim). No
+    tile gets four edges, since there is no cross piece; in the rare case
+    that leaves a tile unreachable, a new tree is drawn.
+    """
+    cells = size * size
+    while True:
+        tiles = [0] * cells
+        root = rng.randrange(cells)
+        in_tree = {root}
+        frontier = [(root, edge) for edge in EDGES if neighbour(size, root, edge) is not None]
+        while frontier:
+            pick = rng.randrange(len(frontier))
+            frontier[pick], frontier[-1] = frontier[-1], frontier[pick]
+            cell, edge = frontier.pop()
+            other = neighbour(size, cell, edge)
+            if other in in_tree or tiles[cell].bit_count() == 3:
+                continue
+            tiles[cell] |= edge
+            tiles[other] |= OPPOSITE[edge]
+            in_tree.add(other)
+            frontier.extend(
+                (other, e) for e in EDGES
+                if neighbour(size, other, e) is not None and neighbour(size, other, e) not in in_tree
+            )
+        if len(in_tree) == cells:
+            return tiles
+
+
+def _farthest(size, tiles, start):
+    """The tile farthest from ``start`` along the links."""
+    seen = {start}
+    queue = deque([start])
+    last = start
+    while queue:
+        last = queue.popleft()
+        for other in linked(size, tiles, last):
+            if other not in seen:
+                seen.add(other)
+                queue.append(other)
+    return last
+
+
+def generate_board(size: int, rng=random) -> dict:
+    """
+    A scrambled ``size`` x ``size`` board. The tiles are cut from a spanning
+    tree, so rotating every tile back to its drawn orientation links the
+    whole board; start and goal are two far-apart endpoint tiles of it.
+    """
+    solved = _spanning_tree(size, rng)
+    leaves = [i for i, mask in enumerate(solved) if mask.bit_count() == 1]
+    start = rng.choice(leaves)
+    # Leaves are the last tiles a breadth-first walk reaches, so this is one too.
+    goal = _farthest(size, solved, start)
+
+    while True:
+        tiles = [rotate(mask, rng.randrange(4)) for mask in solved]
+        board = {"size": size, "tiles": tiles, "start": start, "goal": goal}
+        if not Connectivity(board).solved():
+            return board
+
+
+# ---------- Connectivity ---------- #
+
+class Connectivity:
+    """
+    Linked components of a board, kept up to date as tiles rotate.
+
+    Every tile carries a component label, and each label keeps its member
+    set. A new link merges the smaller component into the larger one
+    (union by size), so a tile is relabelled O(log n) times over any
+    sequence of joins. A lost link may split a component: two searches run
+    in lockstep from its ends, stopping as soon as they meet (still one
+    component) or one runs out, and only the side that ran out -- the
+    smaller one -- is relabelled. A rotation therefore touches the tile's
+    four neighbours and, at worst, the smaller pieces of a split; the board
+    is scanned once, when the object is built.
+
+    The board's ``tiles`` list is updated in place.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.size = board["size"]
+        self.tiles = board["tiles"]
+        self.label = [None] * len(self.tiles)
+        self.members = {}
+        self._next_label = 0
+        for index in range(len(self.tiles)):
+            if self.label[index] is None:
+                self._relabel(self._search(index))
+
+    def connected(self, a, b):
+        return self.label[a] == self.label[b]
+
+    def component(self, index):
+        """The set of tiles linked to ``index``; do not modify it."""
+        return self.members[self.label[index]]
+
+    def solved(self):
+        return self.connected(self.board["start"], self.board["goal"])
+
+    def rotate(self, index, turns=1):
+        """Rotates a tile clockwise and updates the components around it."""
+        before = set(linked(self.size, self.tiles, index))
+        self.tiles[index] = rotate(self.tiles[index], turns)
+        after = set(linked(self.size, self.tiles, index))
+        # With several links gone at once the old component can fall into
+        # more than two pieces, each holding an end of a lost link.
+        ends = [index, *(before - after)]
+        for i, a in enumerate(ends):
+            for b in ends[i + 1:]:
+                self._split(a, b)
+        for other in after - before:
+            self._join(index, other)
+
+    def _search(self, start):
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for other in linked(self.size, self.tiles, queue.popleft()):
+                if other not in seen:
+                    seen.add(other)
+                    queue.append(other)
+        return seen
+
+    def _relabel(self, tiles):
+        """Moves ``tiles`` out of their current component into a new one."""
+        new = self._next_label
+        self._next_label += 1
+        for index in tiles:
+            old = self.label[index]
+            if old is not None:
+                members = self.members[old]
+                members.discard(index)
+                if not members:
+                    del self.members[old]
+            self.label[index] = new
+        self.members[new] = set(tiles)
+
+    def _join(self, a, b):
+        la, lb = self.label[a], self.label[b]
+        if la == lb:
+            return
+        if len(self.members[la]) < len(self.members[lb]):
+            la, lb = lb, la
+        moved = self.members.pop(lb)
+        for index in moved:
+            self.label[index] = la
+        self.members[la] |= moved
+
+    def _split(self, a, b):
+        """Gives b a component of its own if it is no longer linked to a."""
+        if self.label[a] != self.label[b]:
+            return
+        sides = [({a}, deque([a])), ({b}, deque([b]))]
+        while True:
+            for mine, theirs in ((0, 1), (1, 0)):
+                seen, queue = sides[mine]
+                if not queue:
+                    self._relabel(seen)
+                    return
+                for other in linked(self.size, self.tiles, queue.popleft()):
+                    if other in sides[theirs][0]:
+                        return
+                    if other not in seen:
+                        seen.add(other)
+                        queue.append(other)
@@ -1,10 +1,177 @@
+import os
+import re
+import time
+import uuid
+
 import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from games import DigitspanGame, NumerosityGame, ShapedanceGame,FlashbackGame,PathfinderGame
+from games.assets import use_stylesheet
+from runtime import timers, visibility, warmup
+from runtime.admission import AdmissionController
+from runtime.batteries import BatteryFile
+from runtime.eventlog import EventLog, owners
+
+EVENT_DIR = os.environ.get("JOBJITSU_EVENT_DIR", ".sessions")
+EVENT_TTL = int(os.environ.get("JOBJITSU_EVENT_TTL", str(7 * 24 * 3600)))  # keep logs this many seconds
+BATTERY_FILE = os.environ.get("JOBJITSU_BATTERIES")
+MAX_ACTIVE = int(os.environ.get("JOBJITSU_MAX_ACTIVE", "50"))             # game slots per process
+P95_TARGET_MS = float(os.environ.get("JOBJITSU_P95_TARGET_MS", "250"))    # 0 keeps the cap fixed
+QUEUE_POLL_SECONDS = 5
+WARMUP_WAIT_SECONDS = 30  # after this, sessions stop waiting and build what they need lazily
+
+# Streamlit has no hook before the first session, so the warm-up starts when
+# the first session imports this script; later sessions find it done.
+warmup.start()
+
+
+@st.cache_resource
+def battery_file(path):
+    return BatteryFile(path)
+
+
+def candidate_battery():
+    """
+    The pre-issued battery for the ?candidate= query parameter, if a battery
+    file is configured (JOBJITSU_BATTERIES) and contains that candidate.
+    """
+    if "_battery" not in st.session_state:
+        candidate_id = st.query_params.get("candidate")
+        battery = None
+        if BATTERY_FILE and candidate_id:
+            battery = battery_file(BATTERY_FILE).get(candidate_id)
+            if battery is None:
+                st.sidebar.warning(f"No test battery found for {candidate_id}.")
+        st.session_state["_battery"] = battery
+    return st.session_state["_battery"]
+
+
+@st.cache_resource
+def admission():
+    """Process-wide admission control, shared by every session."""
+    return AdmissionController(
+        max_cap=MAX_ACTIVE,
+        target_p95=P95_TARGET_MS / 1000 if P95_TARGET_MS > 0 else None,
+        on_admit=timers.wake_session,
+    )
+
+
+def release_slot():
+    """Gives this session's game slot (or place in line) to the next in line."""
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        admission().release(ctx.session_id)
+
+
+def waiting_room(game, state):
+    """
+    Returns True if this session may play. Otherwise shows its place in the
+    waiting room, keeps the game clock paused, and reruns only every few
+    seconds to refresh the position (an admitted session is woken at once).
+    A finished game needs no slot: only its final score is left to show.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return True
+    if game.is_over(state):
+        admission().release(ctx.session_id)
+        return True
+    position = admission().admit(ctx.session_id)
+    if position == 0:
+        return True
+    visibility.suspend(state)
+    timers.cancel_wakeups("game_end")
+    st.info(f"⏳ All game slots are busy. You are number {position} in line; "
+            "your game starts automatically, with its clock paused until then.")
+    timers.request_wakeup("admission", time.time() + QUEUE_POLL_SECONDS)
+    return False
+
+
+def render_admission_metrics():
+    stats = admission().stats()
+    p95 = "–" if stats["p95"] is None else f"{stats['p95'] * 1000:.0f} ms"
+    st.sidebar.caption(f"Game slots {stats['active']}/{stats['cap']} · "
+                       f"waiting {stats['waiting']} · rerun p95 {p95}")
+
+
+def session_log():
+    """
+    Event log for this browser session. It is keyed by the ?sid= query
+    parameter, so after a server restart the page reconnects to the same log
+    and every game is rebuilt from its last snapshot plus the log tail.
+    """
+    log = st.session_state.get("_event_log")
+    if log is not None:
+        return log
+    ctx = get_script_run_ctx()
+    owner = ctx.session_id if ctx else None
+    alive = Runtime.instance().is_active_session if Runtime.exists() else (lambda _: True)
+    sid = st.query_params.get("sid", "")
+    if re.fullmatch(r"[0-9a-f]{32}", sid) and EventLog.exists(EVENT_DIR, sid):
+        if owners.claim(sid, owner, alive):
+            log = EventLog.restore(EVENT_DIR, sid)
+            for key, state in log.restored_states().items():
+                st.session_state[key] = state
+        else:
+            # Another open tab is writing this log; two writers would corrupt it.
+            st.sidebar.warning("This game is already open in another tab, so a new one was started here.")
+    if log is None:
+        prune_event_logs()
+        sid = uuid.uuid4().hex
+        st.query_params["sid"] = sid
+        owners.claim(sid, owner)
+        log = EventLog(EVENT_DIR, sid)
+    st.session_state["_event_log"] = log
+    return log
+
+
+FLASHBACK_DEFAULTS = {"_flashback_n_back": 1, "_flashback_match_rate": 0.3, "_flashback_lure_rate": 0.1}
+
+
+def _drop_unstarted_flashback():
+    """Settings changed before the first shape: let the game be rebuilt with them."""
+    state = st.session_state.get("flashback")
+    if state is not None and state["current_shape"] is None:
+        del st.session_state["flashback"]
+
+
+def flashback_options():
+    """
+    Sidebar settings for FlashBack. They can change until the first shape is
+    shown (Restart Game keeps them); a candidate battery overrides them.
+    """
+    state = st.session_state.get("flashback")
+    from_battery = bool((candidate_battery() or {}).get("flashback"))
+    locked = from_battery or (state is not None and state["current_shape"] is not None)
+    for key, default in FLASHBACK_DEFAULTS.items():
+        st.session_state.setdefault(key, default)
+    st.sidebar.subheader("FlashBack settings")
+    n_back = st.sidebar.number_input("Compare with the shape this many back", min_value=1, max_value=4,
+                                     key="_flashback_n_back", disabled=locked,
+                                     on_change=_drop_unstarted_flashback)
+    match_rate = st.sidebar.slider("Share of matches", 0.1, 0.6, step=0.05, key="_flashback_match_rate",
+                                   disabled=locked, on_change=_drop_unstarted_flashback)
+    lure_rate = st.sidebar.slider("Share of lures (repeats of a nearby shape)", 0.0, 0.3, step=0.05,
+                                  key="_flashback_lure_rate", disabled=locked, on_change=_drop_unstarted_flashback)
+    if locked:
+        st.sidebar.caption("Set by your test battery." if from_battery else "Restart the game to change these.")
+    return {"n_back": int(n_back), "match_rate": match_rate, "lure_rate": lure_rate}
+
+
+@st.cache_resource(ttl=3600)
+def prune_event_logs():
+    """Deletes logs older than JOBJITSU_EVENT_TTL; cached, so it scans at most once an hour."""
+    return EventLog.expire(EVENT_DIR, EVENT_TTL)
 
 
 def main():
     st.set_page_config(page_title="Cognitive Game Practice", layout="centered")
     st.title("🧠 Cognitive Game Practice App")
+    use_stylesheet()
+    if not warmup.finished.is_set():
+        with st.spinner("Warming up…"):
+            warmup.finished.wait(WARMUP_WAIT_SECONDS)
 
     st.sidebar.title("Select a Game")
     game_choice = st.sidebar.selectbox(
@@ -20,13 +187,43 @@ def main():
         "Pathfinder": PathfinderGame
     }
 
+    # Per-game constructor options; the timer wheel hides timed stimuli on schedule.
+    game_options = {"Digitspan": {"wakeup": timers.request_wakeup}}
+    if game_choice == "FlashBack":
+        game_options["FlashBack"] = {"wakeup": timers.request_wakeup, **flashback_options()}
+
     selected_game_class = game_mapping.get(game_choice)
     if st.sidebar.button("Restart Game"):
+        if "_event_log" in st.session_state:
+            log = st.session_state["_event_log"]
+            log.close()
+            ctx = get_script_run_ctx()
+            owners.release(log.session_id, ctx.session_id if ctx else None)
+        st.query_params.pop("sid", None)
+        settings = {key: st.session_state[key] for key in FLASHBACK_DEFAULTS if key in st.session_state}
         st.session_state.clear()
+        st.session_state.update(settings)
         st.rerun()
 
     if selected_game_class:
-        game = selected_game_class()
+        game = selected_game_class(event_log=session_log(), battery=candidate_battery(),
+                                   **game_options.get(game_choice, {}))
+        # Hidden or idle tabs pause the clock and stop rerunning until the player returns.
+        state = st.session_state[game.state_key]
+        suspended = visibility.guard(state)
+        visibility.render_metrics()
+        render_admission_metrics()
+        if suspended:
+            # No deadline may wake a suspended session; they are set again on resume.
+            timers.cancel_wakeups()
+            release_slot()  # taken again, or queued for, when the tab comes back
+            st.info("⏸️ Game paused while this tab is hidden or idle. It resumes when you come back.")
+            return
+        if not waiting_room(game, state):
+            return
+        # One wake-up from the process-wide timer wheel ends the game on time,
+        # even if the player never clicks again.
+        timers.request_wakeup("game_end", state["start_time"] + state["total_time"])
         game.play()
     else:
         st.error("Invalid game selection.")
@@ -35,4 +232,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    started = time.perf_counter()
+    try:
+        main()
+    finally:
+        # Every rerun's duration feeds the latency-driven game slot cap.
+        admission().record_latency(time.perf_counter() - started)
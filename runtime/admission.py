@@ -0,0 +1,155 @@
+"""
+Admission control for game sessions.
+
+At most ``cap`` sessions per process play at once; the rest wait in a FIFO
+waiting room and are admitted, oldest first, as slots free up. Waiting
+sessions rerun only every few seconds to refresh their place in line, and
+a session is woken at once when it is admitted.
+
+The cap adapts to load (AIMD): every rerun reports how long it took, and
+when the p95 of recent reruns is over the target the cap is cut by a
+fifth; while it is comfortably under the target and the room is full, the
+cap grows by one slot at a time, up to ``max_cap``. A lower cap never
+evicts anyone already playing; it only holds back the queue.
+
+Slots are released when a game ends for any reason, while its tab is
+hidden or idle (it is admitted again, or queued, when it comes back), when
+the tab disconnects, or after ``idle_timeout`` seconds without a rerun.
+"""
+import bisect
+import itertools
+import math
+import threading
+import time
+from collections import deque
+
+from streamlit.runtime import Runtime
+
+
+class AdmissionController:
+
+    def __init__(self, max_cap=50, min_cap=1, target_p95=0.25, window=200,
+                 adjust_every=5.0, idle_timeout=300.0, on_admit=None, clock=time.monotonic):
+        self.max_cap = max_cap
+        self.min_cap = min(min_cap, max_cap)
+        self.cap = max_cap
+        self.target_p95 = target_p95        # seconds; None turns off tuning
+        self.adjust_every = adjust_every
+        self.idle_timeout = idle_timeout
+        self.on_admit = on_admit            # called with each session id admitted from the queue
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._active = {}                   # session_id -> last seen
+        self._waiting = {}                  # session_id -> (ticket, last seen)
+        self._queue = []                    # tickets still waiting, ascending
+        self._ticket_owner = {}             # ticket -> session_id
+        self._tickets = itertools.count()
+        self._latencies = deque(maxlen=window)
+        self._last_adjust = clock()
+        self._last_sweep = clock()
+
+    # ---------- Slots ---------- #
+
+    def admit(self, session_id):
+        """
+        Returns 0 if the session may play, otherwise its 1-based place in
+        the waiting room (joining it if needed).
+        """
+        now = self.clock()
+        with self._lock:
+            if session_id in self._active:
+                self._active[session_id] = now
+                return 0
+            admitted = self._sweep(now)
+            if session_id not in self._waiting:
+                ticket = next(self._tickets)
+                self._queue.append(ticket)
+                self._ticket_owner[ticket] = session_id
+                self._waiting[session_id] = (ticket, now)
+            else:
+                self._waiting[session_id] = (self._waiting[session_id][0], now)
+            admitted += self._fill()
+            if session_id in self._active:
+                position = 0
+            else:
+                position = bisect.bisect_left(self._queue, self._waiting[session_id][0]) + 1
+        self._notify(a for a in admitted if a != session_id)
+        return position
+
+    def release(self, session_id):
+        """Gives up the session's slot or place in line."""
+        with self._lock:
+            self._drop(session_id)
+            admitted = self._fill()
+        self._notify(admitted)
+
+    def _drop(self, session_id):
+        self._active.pop(session_id, None)
+        entry = self._waiting.pop(session_id, None)
+        if entry is not None:
+            ticket = entry[0]
+            del self._ticket_owner[ticket]
+            del self._queue[bisect.bisect_left(self._queue, ticket)]
+
+    def _fill(self):
+        """Admits waiting sessions, oldest first, while slots are free."""
+        admitted = []
+        while self._queue and len(self._active) < self.cap:
+            session_id = self._ticket_owner.pop(self._queue.pop(0))
+            del self._waiting[session_id]
+            self._active[session_id] = self.clock()
+            admitted.append(session_id)
+        return admitted
+
+    def _sweep(self, now):
+        """At most once a second, drops sessions that disconnected or went idle."""
+        if now - self._last_sweep < 1.0:
+            return []
+        self._last_sweep = now
+        alive = Runtime.instance().is_active_session if Runtime.exists() else (lambda _: True)
+        stale = [s for s, seen in self._active.items() if now - seen > self.idle_timeout or not alive(s)]
+        stale += [s for s, (_, seen) in self._waiting.items() if now - seen > self.idle_timeout or not alive(s)]
+        for session_id in stale:
+            self._drop(session_id)
+        return self._fill()
+
+    def _notify(self, session_ids):
+        if self.on_admit is not None:
+            for session_id in session_ids:
+                self.on_admit(session_id)
+
+    # ---------- Latency-driven cap ---------- #
+
+    def record_latency(self, seconds):
+        """Reports how long one rerun took; may move the cap."""
+        now = self.clock()
+        with self._lock:
+            self._latencies.append(seconds)
+            admitted = []
+            if (self.target_p95 is not None and now - self._last_adjust >= self.adjust_every
+                    and len(self._latencies) >= 20):
+                self._last_adjust = now
+                p95 = self._p95()
+                if p95 > self.target_p95:
+                    self.cap = max(self.min_cap, math.floor(self.cap * 0.8))
+                    self._latencies.clear()  # judge the new cap on fresh reruns only
+                elif p95 < 0.7 * self.target_p95 and len(self._active) >= self.cap:
+                    self.cap = min(self.max_cap, self.cap + 1)
+                    admitted = self._fill()
+        self._notify(admitted)
+
+    def _p95(self):
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cap": self.cap,
+                "active": len(self._active),
+                "waiting": len(self._queue),
+                "p95": self._p95(),
+            }
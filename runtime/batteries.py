@@ -0,0 +1,183 @@
+"""
+Bulk generation of seed-locked candidate test batteries.
+
+A battery is the fixed content a candidate will see: the Digitspan
+sequences, Numerosity puzzles, Shapedance levels and Pathfinder puzzles for
+every level, plus the seed and opening items of their Flashback stream. Each
+candidate's content comes from its own RNG seeded with (cohort seed,
+candidate ID), so batteries are unique per candidate and reproducible.
+
+Batteries are generated across a process pool and written to one indexed
+file: a header, the zlib-compressed records, then an open-addressing hash
+table of (id hash, offset, length) entries. The app memory-maps the file and
+finds a candidate's record with a single hash probe sequence, without
+loading the index.
+
+    python -m runtime.batteries generate candidates.txt cohort.jjb --seed 2024
+    python -m runtime.batteries show cohort.jjb alice@example.com
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import pickle
+import random
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from games import DigitspanGame, NumerosityGame, ShapedanceGame, PathfinderGame, SessionState
+from games.nback import nback_sequence
+
+MAGIC = b"JJB1"
+HEADER = struct.Struct("<4sIQQ")      # magic, record count, table offset, table slots
+SLOT = struct.Struct("<QQI")          # id hash, record offset, record length (0 = empty)
+
+DIGITSPAN_LEVELS = 18
+LEVELS = 20                           # levels pre-issued for the open-ended games
+FLASHBACK_PREVIEW = 60                # stream items stored for review
+
+
+def candidate_seed(cohort_seed, candidate_id):
+    digest = hashlib.blake2b(f"{cohort_seed}:{candidate_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def id_hash(candidate_id):
+    digest = hashlib.blake2b(candidate_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1  # 0 marks an empty slot
+
+
+def generate_battery(candidate_id, cohort_seed, levels=LEVELS):
+    """Builds one candidate's battery with the games' own generators."""
+    rng = random.Random(candidate_seed(cohort_seed, candidate_id))
+    state = SessionState()
+    digitspan = DigitspanGame(state, rng=rng)
+    numerosity = NumerosityGame(state, rng=rng)
+    shapedance = ShapedanceGame(state, rng=rng)
+    pathfinder = PathfinderGame(state, rng=rng)
+    stream_seed = rng.getrandbits(64)
+    return {
+        "candidate_id": candidate_id,
+        "digitspan": [digitspan.make_sequence(level) for level in range(1, DIGITSPAN_LEVELS + 1)],
+        "numerosity": [numerosity.make_puzzle(level) for level in range(1, levels + 1)],
+        "shapedance": [shapedance.make_level(level) for level in range(1, levels + 1)],
+        "pathfinder": [pathfinder.make_puzzle() for _ in range(levels)],
+        "flashback": {
+            "n": 1,
+            "match_rate": 0.3,
+            "lure_rate": 0.1,
+            "seed": stream_seed,
+            "sequence": [
+                (item["shape"], item["color"], item["is_match"])
+                for item in nback_sequence(FLASHBACK_PREVIEW, n=1, match_rate=0.3, lure_rate=0.1, seed=stream_seed)
+            ],
+        },
+    }
+
+
+def _encode(job):
+    candidate_id, cohort_seed, levels = job
+    battery = generate_battery(candidate_id, cohort_seed, levels)
+    return candidate_id, zlib.compress(pickle.dumps(battery, protocol=pickle.HIGHEST_PROTOCOL), 6)
+
+
+def write_batteries(candidate_ids, path, cohort_seed, workers=None, levels=LEVELS, chunksize=64):
+    """Generates every battery on a process pool and writes the indexed file. Returns the count."""
+    candidate_ids = list(dict.fromkeys(candidate_ids))  # drop duplicates, keep order
+    slots = 1
+    while slots < 2 * max(1, len(candidate_ids)):
+        slots *= 2
+    table = bytearray(SLOT.size * slots)
+
+    jobs = ((cid, cohort_seed, levels) for cid in candidate_ids)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        f.write(HEADER.pack(MAGIC, 0, 0, 0))
+        for candidate_id, record in pool.map(_encode, jobs, chunksize=chunksize):
+            offset = f.tell()
+            f.write(record)
+            h = id_hash(candidate_id)
+            index = h & (slots - 1)
+            while SLOT.unpack_from(table, index * SLOT.size)[2]:
+                index = (index + 1) & (slots - 1)
+            SLOT.pack_into(table, index * SLOT.size, h, offset, len(record))
+        table_offset = f.tell()
+        f.write(table)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(candidate_ids), table_offset, slots))
+    os.replace(tmp_path, path)
+    return len(candidate_ids)
+
+
+class BatteryFile:
+    """Read-only, memory-mapped view of a battery file."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._table, self._slots = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a battery file")
+
+    def __len__(self):
+        return self.count
+
+    def get(self, candidate_id):
+        """Returns the candidate's battery, or None if the file has no such candidate."""
+        h = id_hash(candidate_id)
+        index = h & (self._slots - 1)
+        while True:
+            slot_hash, offset, length = SLOT.unpack_from(self._map, self._table + index * SLOT.size)
+            if length == 0:
+                return None
+            if slot_hash == h:
+                battery = pickle.loads(zlib.decompress(self._map[offset:offset + length]))
+                if battery["candidate_id"] == candidate_id:
+                    return battery
+            index = (index + 1) & (self._slots - 1)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def read_candidates(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and inspect candidate test batteries")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="generate batteries for a candidate list (one ID per line)")
+    gen.add_argument("candidates")
+    gen.add_argument("output")
+    gen.add_argument("--seed", required=True, help="cohort seed; the same seed reproduces the batteries")
+    gen.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    gen.add_argument("--levels", type=int, default=LEVELS)
+    show = sub.add_parser("show", help="print one candidate's battery")
+    show.add_argument("path")
+    show.add_argument("candidate_id")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        candidates = read_candidates(args.candidates)
+        started = time.perf_counter()
+        count = write_batteries(candidates, args.output, args.seed, args.workers, args.levels)
+        elapsed = time.perf_counter() - started
+        print(f"Wrote {count} batteries to {args.output} in {elapsed:.1f}s ({count / elapsed:,.0f}/s)")
+    else:
+        batteries = BatteryFile(args.path)
+        battery = batteries.get(args.candidate_id)
+        if battery is None:
+            parser.exit(1, f"No battery for {args.candidate_id}\n")
+        for game in ("digitspan", "numerosity", "shapedance", "pathfinder"):
+            print(f"{game}: {len(battery[game])} levels, level 1 = {battery[game][0]!r}")
+        print(f"flashback: seed {battery['flashback']['seed']}, "
+              f"first items {battery['flashback']['sequence'][:5]}")
+
+
+if __name__ == "__main__":
+    main()
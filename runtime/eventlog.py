@@ -0,0 +1,265 @@
+"""
+Per-session event log with periodic snapshots.
+
+Every game transition (see ``games.state.transition``) is appended to
+``<dir>/<session_id>.log`` as one compact event holding only the keys that
+changed. Every ``snapshot_every`` events the current state of all games is
+written to ``<session_id>.snap`` together with the log offset it covers, so
+a session is rebuilt from its last snapshot plus the log tail. The log itself
+is never truncated (except for a torn final record after a crash), so a
+whole game can also be replayed event by event.
+
+The log file is opened, appended to and closed for each event, so an idle
+or queued session holds no file descriptor. ``EventLog.expire`` deletes the
+files of sessions untouched for longer than a retention period.
+
+Record format: 4-byte little-endian length, then a pickled tuple
+``(seq, time, game, action, args, changes, removed)``.
+
+    python -m runtime.eventlog replay <dir> <session_id>
+"""
+import argparse
+import copy
+import os
+import pickle
+import struct
+import threading
+import time
+from collections import namedtuple
+
+Event = namedtuple("Event", "seq time game action args changes removed")
+
+HEADER = struct.Struct("<I")
+SNAPSHOT_EVERY = 100
+
+
+def apply_event(states, event):
+    """Applies one event to a {game_key: state_dict} mapping in place."""
+    state = states.setdefault(event.game, {})
+    state.update(event.changes)
+    for key in event.removed:
+        state.pop(key, None)
+
+
+def read_events(path, offset=0):
+    """Yields (event, end_offset) for every complete record from ``offset`` on."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            (length,) = HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return  # torn write at the end of the log
+            offset += HEADER.size + length
+            yield Event(*pickle.loads(payload)), offset
+
+
+class EventLog:
+    def __init__(self, directory, session_id, snapshot_every=SNAPSHOT_EVERY):
+        self.directory = directory
+        self.session_id = session_id
+        self.snapshot_every = snapshot_every
+        self.log_path = os.path.join(directory, f"{session_id}.log")
+        self.snap_path = os.path.join(directory, f"{session_id}.snap")
+        os.makedirs(directory, exist_ok=True)
+        self.seq = 0
+        self.states = {}  # game key -> state as of the last logged event
+        self.offset = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        self.closed = False
+
+    @classmethod
+    def exists(cls, directory, session_id):
+        return os.path.exists(os.path.join(directory, f"{session_id}.log"))
+
+    # ---------- Writing ---------- #
+
+    def sync(self, game, state, action, args=()):
+        """
+        Logs the difference between ``state`` and what was last logged for
+        ``game`` as one event. Does nothing if nothing changed.
+        """
+        last = self.states.setdefault(game, {})
+        changes = {k: v for k, v in state.items() if k not in last or last[k] != v}
+        removed = tuple(k for k in last if k not in state)
+        if not changes and not removed:
+            return None
+
+        event = Event(self.seq, time.time(), game, action, tuple(args), changes, removed)
+        payload = pickle.dumps(tuple(event), protocol=pickle.HIGHEST_PROTOCOL)
+        record = HEADER.pack(len(payload)) + payload
+        with open(self.log_path, "ab") as f:
+            f.write(record)
+        self.offset += len(record)
+
+        for k, v in changes.items():
+            last[k] = copy.deepcopy(v)
+        for k in removed:
+            del last[k]
+        self.seq += 1
+        if self.seq % self.snapshot_every == 0:
+            self.snapshot()
+        return event
+
+    def snapshot(self):
+        """Atomically writes the current state of every game and the log offset it covers."""
+        data = pickle.dumps(
+            {"seq": self.seq, "offset": self.offset, "states": self.states},
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        tmp_path = self.snap_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.snap_path)
+
+    def close(self):
+        """Writes a final snapshot; the log takes no further events."""
+        if not self.closed:
+            self.snapshot()
+            self.closed = True
+
+    def delete(self):
+        """Removes the session's log and snapshot; the log takes no further events."""
+        self.closed = True
+        _remove_files(os.path.join(self.directory, self.session_id))
+
+    @staticmethod
+    def expire(directory, max_age):
+        """
+        Deletes the log and snapshot of every session whose log was last
+        written more than ``max_age`` seconds ago. Returns how many sessions
+        were removed.
+        """
+        cutoff = time.time() - max_age
+        removed = 0
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            if not entry.name.endswith(".log"):
+                continue
+            try:
+                if entry.stat().st_mtime > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            if _remove_files(entry.path[:-len(".log")]):
+                removed += 1
+        return removed
+
+    # ---------- Recovery ---------- #
+
+    @classmethod
+    def restore(cls, directory, session_id, snapshot_every=SNAPSHOT_EVERY):
+        """
+        Rebuilds a session from its last snapshot plus the log tail and
+        returns an EventLog ready for appending; ``log.states`` holds the
+        rebuilt state of every game.
+        """
+        log_path = os.path.join(directory, f"{session_id}.log")
+        snap_path = os.path.join(directory, f"{session_id}.snap")
+        seq, offset, states = 0, 0, {}
+        if os.path.exists(snap_path):
+            with open(snap_path, "rb") as f:
+                snapshot = pickle.load(f)
+            seq, offset, states = snapshot["seq"], snapshot["offset"], snapshot["states"]
+
+        end = offset
+        if os.path.exists(log_path):
+            for event, end in read_events(log_path, offset):
+                apply_event(states, event)
+                seq = event.seq + 1
+            # Drop a torn final record so new events start on a record boundary.
+            if os.path.getsize(log_path) > end:
+                with open(log_path, "r+b") as f:
+                    f.truncate(end)
+
+        log = cls(directory, session_id, snapshot_every)
+        log.seq, log.states = seq, states
+        return log
+
+    def restored_states(self):
+        """Deep copies of the rebuilt states, safe to hand to the games."""
+        return copy.deepcopy(self.states)
+
+
+def _remove_files(base):
+    """Deletes ``base``.log and its snapshots; returns False if the log was already gone."""
+    try:
+        os.remove(base + ".log")
+    except FileNotFoundError:
+        return False
+    finally:
+        for suffix in (".snap", ".snap.tmp"):
+            try:
+                os.remove(base + suffix)
+            except FileNotFoundError:
+                pass
+    return True
+
+
+# ---------- Ownership ---------- #
+
+class LogOwners:
+    """
+    Which writer owns each session log in this process. Two writers
+    appending to one log would each number events from their own ``seq``,
+    so a log is only handed to a second writer once the first is gone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owners = {}
+
+    def claim(self, session_id, owner, alive=lambda owner: True):
+        """Takes the log for ``owner`` unless another live owner holds it."""
+        with self._lock:
+            current = self._owners.get(session_id)
+            if current is not None and current != owner and alive(current):
+                return False
+            self._owners[session_id] = owner
+            return True
+
+    def release(self, session_id, owner):
+        with self._lock:
+            if self._owners.get(session_id) == owner:
+                del self._owners[session_id]
+
+
+owners = LogOwners()
+
+
+def replay(directory, session_id):
+    """
+    Deterministically replays a whole session from the start of its log.
+    Yields (event, states) after each event; ``states`` is updated in place,
+    so copy it if you need to keep an intermediate state.
+    """
+    states = {}
+    for event, _ in read_events(os.path.join(directory, f"{session_id}.log")):
+        apply_event(states, event)
+        yield event, states
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect JobJitsu session event logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay_cmd = sub.add_parser("replay", help="print every event of a session")
+    replay_cmd.add_argument("directory")
+    replay_cmd.add_argument("session_id")
+    args = parser.parse_args()
+
+    for event, states in replay(args.directory, args.session_id):
+        state = states[event.game]
+        print(
+            f"#{event.seq:<5} {event.game:<11} {event.action:<16} args={event.args!r:<10} "
+            f"level={state.get('level')} score={state.get('score')} stage={state.get('stage')} "
+            f"changed={sorted(event.changes)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
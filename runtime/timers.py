@@ -0,0 +1,228 @@
+"""
+Process-wide hierarchical timer wheel for session deadlines.
+
+Every session's deadlines (game end, stimulus hide) live in one wheel that
+a single background thread advances. When a deadline is reached, the owning
+Streamlit session gets exactly one rerun request, so games no longer poll
+with ``time.sleep(1); st.rerun()`` to notice that time ran out.
+
+The wheel has ``levels`` rings of ``2**bits`` slots. Ring 0 holds timers due
+within one revolution at tick resolution; each outer ring covers 2**bits
+revolutions of the ring inside it, and its timers are cascaded inwards as
+the inner ring wraps. Scheduling and cancelling are O(1) set operations.
+With the defaults (50 ms ticks, 4 rings of 256 slots) the wheel reaches
+about 6.8 years ahead.
+"""
+import logging
+import math
+import threading
+import time
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Timer:
+    __slots__ = ("expires", "callback", "slot")
+
+    def __init__(self, expires, callback):
+        self.expires = expires    # absolute tick
+        self.callback = callback
+        self.slot = None          # the set currently holding this timer
+
+
+class TimerWheel:
+    def __init__(self, tick=0.05, bits=8, levels=4, clock=time.monotonic):
+        self.tick = tick
+        self.bits = bits
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.levels = levels
+        self.clock = clock
+        self.wheels = [[set() for _ in range(self.size)] for _ in range(levels)]
+        self.current = 0          # last processed tick
+        self.origin = clock()
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    # ---------- Scheduling ---------- #
+
+    def _ticks_until(self, deadline):
+        """Ticks from now until a time.monotonic() deadline, at least one."""
+        return max(1, math.ceil((deadline - self.origin) / self.tick - 1e-9) - self.current)
+
+    def _insert(self, timer):
+        delta = timer.expires - self.current
+        level = 0
+        while level < self.levels - 1 and delta >= 1 << (self.bits * (level + 1)):
+            level += 1
+        slot = self.wheels[level][(timer.expires >> (self.bits * level)) & self.mask]
+        slot.add(timer)
+        timer.slot = slot
+
+    def schedule(self, deadline, callback):
+        """
+        Calls ``callback()`` on the wheel thread once time.monotonic()
+        reaches ``deadline``. Returns a timer that can be cancelled.
+        """
+        with self._lock:
+            timer = Timer(self.current + self._ticks_until(deadline), callback)
+            self._insert(timer)
+            self.pending += 1
+        return timer
+
+    def cancel(self, timer):
+        """Cancels a pending timer; returns False if it already fired or was cancelled."""
+        with self._lock:
+            if timer.slot is None:
+                return False
+            timer.slot.discard(timer)
+            timer.slot = None
+            self.pending -= 1
+            return True
+
+    # ---------- Advancing ---------- #
+
+    def _cascade(self, level):
+        index = (self.current >> (self.bits * level)) & self.mask
+        slot = self.wheels[level][index]
+        timers = list(slot)
+        slot.clear()
+        for timer in timers:
+            self._insert(timer)
+        return index
+
+    def advance(self, now=None):
+        """Processes every tick up to ``now`` and returns the number of timers fired."""
+        now = self.clock() if now is None else now
+        # The epsilon keeps float error from leaving a tick that is exactly due for later.
+        target = math.floor((now - self.origin) / self.tick + 1e-9)
+        fired = 0
+        while True:
+            with self._lock:
+                if self.current >= target:
+                    break
+                self.current += 1
+                level = 1
+                while level < self.levels and (self.current & ((1 << (self.bits * level)) - 1)) == 0:
+                    self._cascade(level)
+                    level += 1
+                slot = self.wheels[0][self.current & self.mask]
+                due = list(slot)
+                slot.clear()
+                for timer in due:
+                    timer.slot = None
+                self.pending -= len(due)
+            for timer in due:
+                try:
+                    timer.callback()
+                except Exception:
+                    _LOGGER.exception("Timer callback failed")
+            fired += len(due)
+        return fired
+
+    # ---------- Background thread ---------- #
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="timer-wheel", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.tick):
+            self.advance()
+
+
+# ---------- Session wake-ups ---------- #
+
+wheel = TimerWheel()
+_deadlines = {}   # session_id -> {name: (deadline, Timer)}
+_deadlines_lock = threading.Lock()
+
+
+def wake_session(session_id):
+    """
+    Asks Streamlit to rerun a session's script, as if the user had interacted.
+    Uses Runtime internals; this is the only way to start a rerun from outside
+    the session.
+    """
+    if not Runtime.exists():
+        return
+    runtime = Runtime.instance()
+
+    def rerun():
+        info = runtime._session_mgr.get_active_session_info(session_id)
+        if info is not None:
+            info.session.request_rerun(None)
+
+    runtime._get_async_objs().eventloop.call_soon_threadsafe(rerun)
+
+
+def _fire(session_id, name, entry):
+    with _deadlines_lock:
+        deadlines = _deadlines.get(session_id, {})
+        if deadlines.get(name) is not entry:
+            return  # replaced or cancelled while firing
+        del deadlines[name]
+        if not deadlines:
+            del _deadlines[session_id]
+    wake_session(session_id)
+
+
+def request_wakeup(name, deadline):
+    """
+    Makes sure the current session is rerun at ``deadline`` (a time.time()
+    value). Calling it again with the same deadline is a no-op, so it is safe
+    to call on every rerun; a different deadline replaces the old one.
+    Returns False outside a Streamlit server (e.g. in tests), where nothing
+    can wake the session.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None or not Runtime.exists():
+        return False
+    if deadline <= time.time():
+        return True  # already due, and the session is running right now
+    session_id = ctx.session_id
+    with _deadlines_lock:
+        deadlines = _deadlines.setdefault(session_id, {})
+        entry = deadlines.get(name)
+        if entry is not None and entry[0] == deadline:
+            return True
+        if entry is not None:
+            wheel.cancel(entry[1])
+        # The entry exists before the timer does: a wheel thread that is behind
+        # may fire it before schedule() returns, and _fire then waits for the lock.
+        entry = [deadline, None]
+        entry[1] = wheel.schedule(
+            time.monotonic() + (deadline - time.time()),
+            lambda: _fire(session_id, name, entry),
+        )
+        deadlines[name] = entry
+    wheel.start()
+    return True
+
+
+def cancel_wakeups(name=None):
+    """
+    Cancels the current session's pending deadline ``name``, or all of them,
+    e.g. while the session is suspended.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    with _deadlines_lock:
+        deadlines = _deadlines.get(ctx.session_id, {})
+        for key in [name] if name is not None else list(deadlines):
+            entry = deadlines.pop(key, None)
+            if entry is not None:
+                wheel.cancel(entry[1])
+        if not deadlines:
+            _deadlines.pop(ctx.session_id, None)
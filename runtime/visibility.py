@@ -0,0 +1,96 @@
+"""
+Suspends game sessions whose browser tab is hidden or idle.
+
+A zero-height component reports the tab's visibility and idleness back to
+the script. While a session is suspended its game clock is paused and no
+reruns are scheduled at all; the next report from the tab (it becomes
+visible or the user moves the mouse) triggers a rerun that resumes the
+clock exactly where it stopped.
+"""
+import os
+import threading
+import time
+
+import streamlit as st
+import streamlit.components.v1 as components
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+_tab_status = components.declare_component(
+    "tab_status",
+    path=os.path.join(os.path.dirname(__file__), "visibility_component"),
+)
+
+IDLE_SECONDS = 60
+
+
+class PresenceRegistry:
+    """Process-wide record of which sessions are active and which are suspended."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status = {}
+
+    def set(self, session_id, status):
+        with self._lock:
+            self._status[session_id] = status
+
+    def counts(self):
+        """Returns {"active": n, "suspended": m}, forgetting disconnected sessions."""
+        alive = Runtime.instance().is_active_session if Runtime.exists() else (lambda _: True)
+        with self._lock:
+            for session_id in [s for s in self._status if not alive(s)]:
+                del self._status[session_id]
+            suspended = sum(1 for s in self._status.values() if s == "suspended")
+            return {"active": len(self._status) - suspended, "suspended": suspended}
+
+
+registry = PresenceRegistry()
+
+
+def suspend(state):
+    """Pauses the game clock. Calling it again while paused is a no-op."""
+    if state.get("paused_at") is None:
+        state["paused_at"] = time.time()
+
+
+def resume(state):
+    """
+    Restarts the game clock, shifting start_time (and the display start of
+    a stimulus on screen, shown_at) by the time spent paused.
+    """
+    paused_at = state.pop("paused_at", None)
+    if paused_at is not None:
+        paused = time.time() - paused_at
+        state["start_time"] += paused
+        if state.get("shown_at") is not None:
+            state["shown_at"] += paused
+
+
+def guard(state, idle_seconds=IDLE_SECONDS):
+    """
+    Renders the tab status component and pauses or resumes ``state``.
+    Returns True when the session is suspended; the caller should then render
+    nothing that schedules another rerun.
+    """
+    status = _tab_status(idle_ms=int(idle_seconds * 1000), key="tab_status", default="visible")
+    ctx = get_script_run_ctx()
+    session_id = ctx.session_id if ctx else None
+
+    if status in ("hidden", "idle"):
+        suspend(state)
+        if session_id:
+            registry.set(session_id, "suspended")
+        return True
+
+    resume(state)
+    if session_id:
+        registry.set(session_id, "active")
+    return False
+
+
+def render_metrics():
+    counts = registry.counts()
+    col_active, col_suspended = st.sidebar.columns(2)
+    col_active.metric("Active sessions", counts["active"])
+    col_suspended.metric("Suspended", counts["suspended"])
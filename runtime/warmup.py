@@ -0,0 +1,98 @@
+"""
+Boot warm-up: pays every lazy first-use cost before the first candidate does.
+
+``warm_up()`` imports the game modules, builds the shared tables in
+games.tables and plays one throwaway round of content generation per game,
+so code paths, solver caches and rendering helpers are hot. ``ready`` is
+set once it has succeeded and ``finished`` once it has ended either way; if
+it fails, ``error`` holds the exception and everything is built lazily on
+first use, as without a warm-up. The API's /ready endpoint and the
+Streamlit page both wait on ``finished``.
+
+Usage:  python -m runtime.warmup      (runs it once and prints the timings)
+"""
+import logging
+import random
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+ready = threading.Event()       # warm-up succeeded
+finished = threading.Event()    # warm-up ended, successfully or not
+error = None                    # the exception a failed warm-up raised
+timings = {}                    # step -> seconds, for the last warm-up
+
+_run_lock = threading.Lock()    # one warm-up at a time
+_start_lock = threading.Lock()  # guards _thread; never held while warming up
+_thread = None
+
+
+def _step(name, func):
+    started = time.perf_counter()
+    func()
+    timings[name] = time.perf_counter() - started
+
+
+def _prime_games():
+    """One round of every game's content generation, on private throwaway state."""
+    from games import (DigitspanGame, FlashbackGame, NumerosityGame, PathfinderGame,
+                       ShapedanceGame, SessionState)
+    from games.nback import NBackStream
+    from games.shapedance import create_cube_html
+    from games.tileboard import Connectivity
+
+    rng = random.Random(0)
+    DigitspanGame(SessionState(), rng=rng).make_sequence(1)
+    numerosity = NumerosityGame(SessionState(), rng=rng)
+    numerosity.make_puzzle(1)
+    numerosity.make_mixed_puzzle(1)
+    shapedance = ShapedanceGame(SessionState(), rng=rng)
+    level = shapedance.make_level(1)
+    create_cube_html(level["current_patterns"][0], transform=level["transformations"][0])
+    FlashbackGame(SessionState()).get_shape_html(next(NBackStream(1, 0.3, 0.1, seed=0)))
+    pathfinder = PathfinderGame(SessionState(), rng=rng)
+    pathfinder.make_puzzle()
+    Connectivity(pathfinder.make_board(1)).rotate(0)
+
+
+def warm_up():
+    """Runs the warm-up once per process; later calls return at once."""
+    global error
+    if finished.is_set():
+        return
+    with _run_lock:
+        if finished.is_set():
+            return
+        started = time.perf_counter()
+        try:
+            _step("imports", lambda: __import__("api.adapters"))
+            from games import tables
+            _step("tables", tables.get)
+            _step("games", _prime_games)
+            ready.set()
+        except Exception as e:
+            error = e
+            _LOGGER.exception("Warm-up failed; shared tables will be built on first use")
+        finally:
+            timings["total"] = time.perf_counter() - started
+            finished.set()
+
+
+def start():
+    """Starts ``warm_up`` on a background thread, once. Never waits for it."""
+    global _thread
+    if _thread is not None or finished.is_set():
+        return
+    with _start_lock:
+        if _thread is None and not finished.is_set():
+            _thread = threading.Thread(target=warm_up, name="jobjitsu-warmup", daemon=True)
+            _thread.start()
+
+
+if __name__ == "__main__":
+    warm_up()
+    if error is not None:
+        raise SystemExit(f"warm-up failed: {error!r}")
+    for name, seconds in timings.items():
+        print(f"{name:>8}: {seconds * 1000:8.1f} ms")
@@ -0,0 +1,93 @@
+"""AdmissionController: FIFO admission against a plain list, and the AIMD cap."""
+import random
+
+import pytest
+
+from runtime.admission import AdmissionController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_fifo_against_a_list(seed):
+    rng = random.Random(seed)
+    clock = FakeClock()
+    admitted = []
+    cap = rng.randint(1, 5)
+    admission = AdmissionController(max_cap=cap, target_p95=None, on_admit=admitted.append,
+                                    idle_timeout=1e9, clock=clock)
+    active, queue = set(), []  # the reference model
+
+    for _ in range(500):
+        session = rng.randrange(15)
+        if rng.random() < 0.6:
+            position = admission.admit(session)
+            if session not in active and session not in queue:
+                queue.append(session)
+            while queue and len(active) < cap:
+                active.add(queue.pop(0))
+            assert position == (0 if session in active else queue.index(session) + 1)
+        else:
+            admitted.clear()
+            admission.release(session)
+            active.discard(session)
+            if session in queue:
+                queue.remove(session)
+            newly = []
+            while queue and len(active) < cap:
+                newly.append(queue.pop(0))
+                active.add(newly[-1])
+            assert admitted == newly  # oldest first, each woken once
+        stats = admission.stats()
+        assert (stats["active"], stats["waiting"]) == (len(active), len(queue))
+
+
+def test_idle_sessions_lose_their_slot():
+    clock = FakeClock()
+    admission = AdmissionController(max_cap=1, target_p95=None, idle_timeout=10, clock=clock)
+    assert admission.admit("a") == 0
+    assert admission.admit("b") == 1
+    clock.now = 5
+    assert admission.admit("b") == 1
+    clock.now = 12  # a has not rerun for 12 s; b polled 7 s ago
+    assert admission.admit("b") == 0
+
+
+def test_aimd_cap():
+    clock = FakeClock()
+    admitted = []
+    admission = AdmissionController(max_cap=10, min_cap=2, target_p95=0.25, adjust_every=5,
+                                    on_admit=admitted.append, idle_timeout=1e9, clock=clock)
+    for session in range(12):
+        admission.admit(session)
+    assert admission.stats()["active"] == 10
+
+    def window(latency, count=20):
+        """``count`` reruns, then the one that is due to move the cap."""
+        for _ in range(count):
+            admission.record_latency(latency)
+        clock.now += 5
+        admission.record_latency(latency)
+
+    window(0.5)
+    assert admission.cap == 8  # cut by a fifth
+    window(0.5)
+    assert admission.cap == 6
+    assert admission.stats()["active"] == 10  # nobody is evicted
+    window(0.2)  # under the target but not comfortably: no change
+    assert admission.cap == 6
+    for session in range(6):
+        admission.release(session)
+    assert admission.stats()["active"] == 6 and admitted == [10, 11]  # refilled up to the new cap only
+    assert admission.admit(12) == 1
+    window(0.1, count=200)  # the p95 looks at the last 200 reruns, which still hold the 0.2 s ones
+    assert admission.cap == 7 and admitted == [10, 11, 12]  # one slot more, filled from the queue
+    for _ in range(10):
+        window(0.5)
+    assert admission.cap == 2  # never below min_cap
@@ -0,0 +1,170 @@
+"""The JSON API through GameServer.handle_request, without a socket."""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from api.server import GameServer
+
+
+@pytest.fixture
+def server():
+    return GameServer()
+
+
+def request(server, method, path, body=None):
+    return server.handle_request(method, path, json.dumps(body).encode() if body is not None else b"")
+
+
+def started(server, game, **start):
+    _, body = request(server, "POST", "/sessions", {"game": game})
+    session_id = body["session_id"]
+    status, body = request(server, "POST", f"/sessions/{session_id}/start", start)
+    assert status == 200, body
+    return session_id, body
+
+
+# ---------- Routing and bodies ---------- #
+
+@pytest.mark.parametrize("method, path, raw, status", [
+    ("POST", "/sessions", b'{"game": "chess"}', 400),
+    ("POST", "/sessions", b'{"game": ["x"]}', 400),
+    ("POST", "/sessions", b'{"game": {"a": 1}}', 400),
+    ("POST", "/sessions", b"[1, 2]", 400),
+    ("POST", "/sessions", b"{not json", 400),
+    ("GET", "/sessions", b"", 405),
+    ("GET", "/sessions/" + "0" * 32, b"", 404),
+    ("GET", "/nowhere", b"", 404),
+])
+def test_bad_requests(server, method, path, raw, status):
+    assert server.handle_request(method, path, raw)[0] == status
+
+
+def test_session_lifecycle(server):
+    session_id, _ = started(server, "shapedance")
+    assert request(server, "GET", f"/sessions/{session_id}")[0] == 200
+    assert request(server, "PUT", f"/sessions/{session_id}")[0] == 405
+    assert request(server, "POST", f"/sessions/{session_id}/nope")[0] == 404
+    assert request(server, "DELETE", f"/sessions/{session_id}") == (200, {"deleted": session_id})
+    assert request(server, "GET", f"/sessions/{session_id}")[0] == 404
+
+
+# ---------- Answers ---------- #
+
+def test_digitspan_round(server):
+    session_id, body = started(server, "digitspan")
+    assert body["stage"] == "show" and body["sequence"]  # hidden again once the response is built
+    status, body = request(server, "POST", f"/sessions/{session_id}/answer", {"answer": body["sequence"]})
+    assert status == 200 and body["score"] == 1 and body["level"] == 2
+    assert request(server, "POST", f"/sessions/{session_id}/answer", {"answer": "x"})[0] == 409
+
+
+@pytest.mark.parametrize("game, start, payload", [
+    ("numerosity", {}, {"selected": [True, 1]}),
+    ("numerosity", {}, {"selected": [[0], 1]}),
+    ("numerosity", {}, {"selected": [0, 0]}),
+    ("numerosity", {}, {"selected": [99]}),
+    ("numerosity", {}, {"selected": "0,1"}),
+    ("numerosity", {"mode": "classic"}, {"selected": [0.0, 1]}),
+    ("shapedance", {}, {"selected": [False, True]}),
+    ("shapedance", {}, {"selected": [0, 0]}),
+    ("shapedance", {}, {"selected": [0, 1, 2]}),
+    ("flashback", {}, {"match": 1}),
+    ("pathfinder", {}, {"order": ["a", 1, 2, 3]}),
+    ("pathfinder", {}, {"order": [None]}),
+    ("pathfinder", {}, {"order": "1234"}),
+    ("pathfinder", {"mode": "board"}, {"rotate": True}),
+    ("pathfinder", {"mode": "board"}, {"rotate": -1}),
+    ("pathfinder", {"mode": "board"}, {"rotate": "0"}),
+])
+def test_malformed_answers(server, game, start, payload):
+    session_id, _ = started(server, game, **start)
+    if game == "flashback":
+        # The first shape only primes the stream; the second one is answered.
+        request(server, "POST", f"/sessions/{session_id}/start")
+    status, body = request(server, "POST", f"/sessions/{session_id}/answer", payload)
+    assert status == 400, body
+
+
+def test_pathfinder_round(server):
+    session_id, body = started(server, "pathfinder")
+    order = sorted(piece["id"] for piece in body["pieces"])
+    status, body = request(server, "POST", f"/sessions/{session_id}/answer", {"order": order})
+    assert status == 200 and body["score"] == 1
+
+
+# ---------- HTTP ---------- #
+
+def exchange(server, data):
+    """Sends raw bytes to a served GameServer and returns everything it answers."""
+    async def run():
+        listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(data)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return response
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("length, status", [(b"abc", b"400"), (b"-5", b"400"), (b"1000000", b"413")])
+def test_bad_content_length(server, length, status):
+    response = exchange(server, b"POST /sessions HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 " + status)
+    assert b"Connection: close" in response
+
+
+def test_keep_alive(server):
+    body = b'{"game": "numerosity"}'
+    one = b"POST /sessions HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+    last = b"GET /sessions/x HTTP/1.1\r\nConnection: close\r\n\r\n"
+    response = exchange(server, one + one + last)
+    assert response.count(b"HTTP/1.1 201 Created") == 2
+    assert b"HTTP/1.1 404 Not Found" in response
+
+
+# ---------- FlashBack settings ---------- #
+
+def test_flashback_settings(server):
+    status, body = request(server, "POST", "/sessions",
+                           {"game": "flashback", "n_back": 2, "match_rate": 0.5, "lure_rate": 0.2})
+    assert status == 201
+    stream = server.sessions.get(body["session_id"]).state["flashback"]["stream"]
+    assert (stream.n, stream.match_rate, stream.lure_rate) == (2, 0.5, 0.2)
+    status, body = request(server, "POST", f"/sessions/{body['session_id']}/start")
+    assert status == 200 and body["n_back"] == 2
+
+
+@pytest.mark.parametrize("settings", [{"n_back": 0}, {"n_back": True}, {"n_back": 2.0},
+                                      {"match_rate": 0.95}, {"lure_rate": "x"}, {"match_rate": float("nan")}])
+def test_invalid_flashback_settings(server, settings):
+    status, _ = request(server, "POST", "/sessions", {"game": "flashback", **settings})
+    assert status == 400
+    assert len(server.sessions) == 0
+
+
+# ---------- Mixed Numerosity puzzles ---------- #
+
+def test_mixed_puzzle_is_made_off_the_event_loop(server, monkeypatch):
+    from games import NumerosityGame
+    threads = []
+    make = NumerosityGame.make_mixed_puzzle
+
+    def recording(self, level):
+        threads.append(threading.current_thread())
+        return make(self, level)
+
+    monkeypatch.setattr(NumerosityGame, "make_mixed_puzzle", recording)
+    _, body = request(server, "POST", "/sessions", {"game": "numerosity"})
+    path = f"/sessions/{body['session_id']}/start"
+    status, body = asyncio.run(server.respond("POST", path, json.dumps({"mode": "mixed"}).encode()))
+    assert status == 200 and body["mode"] == "mixed"
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+    # Without the executor (e.g. handle_request), the puzzle is still made inline.
+    assert request(server, "POST", path)[0] == 200
+    assert threads[-1] is threading.main_thread()
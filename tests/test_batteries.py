@@ -0,0 +1,29 @@
+"""The battery file's hash table finds every candidate, including after collisions."""
+import pytest
+
+from runtime import batteries
+
+
+@pytest.fixture
+def colliding_hashes(monkeypatch):
+    # Three hash values for every candidate: long probe sequences and equal hashes.
+    monkeypatch.setattr(batteries, "id_hash", lambda candidate_id: 1 + len(candidate_id) % 3)
+
+
+@pytest.mark.parametrize("collide", [False, True])
+def test_every_candidate_is_found(tmp_path, request, collide):
+    if collide:
+        request.getfixturevalue("colliding_hashes")
+    candidates = [f"candidate-{i}@example.com" for i in range(12)] + ["x", "yy", "zzz"]
+    path = str(tmp_path / "cohort.jjb")
+    assert batteries.write_batteries(candidates + candidates[:3], path, "2024", workers=2, levels=1) == 15
+
+    battery_file = batteries.BatteryFile(path)
+    try:
+        assert len(battery_file) == 15
+        for candidate_id in candidates:
+            assert battery_file.get(candidate_id) == batteries.generate_battery(candidate_id, "2024", levels=1)
+        assert battery_file.get("nobody@example.com") is None
+        assert battery_file.get("w") is None
+    finally:
+        battery_file.close()
@@ -0,0 +1,51 @@
+"""The subset DP's solution counts against enumerating every expression tree."""
+import random
+from fractions import Fraction
+
+import pytest
+
+from games.expressions import count_solutions, evaluate_expression
+
+
+def trees(numbers):
+    """Every value of every expression tree over all of ``numbers``, commuted pairs once."""
+    if len(numbers) == 1:
+        return [Fraction(numbers[0])]
+    first, rest = numbers[0], numbers[1:]
+    values = []
+    # The first number always goes left, so each split is visited one way round.
+    for bits in range(1 << len(rest)):
+        if bits == (1 << len(rest)) - 1:
+            continue
+        left = [first] + [n for i, n in enumerate(rest) if bits >> i & 1]
+        right = [n for i, n in enumerate(rest) if not bits >> i & 1]
+        for a in trees(left):
+            for b in trees(right):
+                values += [a + b, a * b, a - b, b - a]
+                if b:
+                    values.append(a / b)
+                if a:
+                    values.append(b / a)
+    return values
+
+
+def brute_force(pool, target, max_terms):
+    total = 0
+    for mask in range(1, 1 << len(pool)):
+        subset = [n for i, n in enumerate(pool) if mask >> i & 1]
+        if 2 <= len(subset) <= max_terms:
+            total += sum(value == target for value in trees(subset))
+    return total
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_count_solutions(seed):
+    rng = random.Random(seed)
+    pool = tuple(rng.randint(1, 9) for _ in range(5))
+    for max_terms in (2, 3, 4):
+        for target in (rng.randint(1, 30), 24, Fraction(3, 2)):
+            assert count_solutions(pool, target, max_terms) == brute_force(pool, target, max_terms)
+
+
+def test_evaluate_expression_is_exact():
+    assert evaluate_expression("6 / 4 * 2") == (3, [6, 4, 2])
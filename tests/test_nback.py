@@ -0,0 +1,42 @@
+"""NBackStream: matches and lures against the stream's own history, at the requested rates."""
+import pytest
+
+from games.nback import NBackStream, nback_sequence
+
+
+@pytest.mark.parametrize("n, match_rate, lure_rate", [(1, 0.3, 0.1), (2, 0.3, 0.1), (3, 0.5, 0.2), (4, 0.2, 0.0)])
+def test_matches_and_lures(n, match_rate, lure_rate):
+    items = list(nback_sequence(20_000, n, match_rate, lure_rate, seed=7))
+    stimuli = [(item["shape"], item["color"]) for item in items]
+    scored = [item for item in items if item["scored"]]
+    assert [item["scored"] for item in items[:n + 1]] == [False] * n + [True]
+
+    lures = 0
+    for i, item in enumerate(items[n:], start=n):
+        # is_match is exactly "same stimulus as n back".
+        assert item["is_match"] == (stimuli[i] == stimuli[i - n])
+        if item["is_lure"]:
+            lures += 1
+            nearby = [stimuli[i - k] for k in (n - 1, n + 1) if 1 <= k <= i]
+            assert stimuli[i] in nearby and not item["is_match"]
+
+    matches = sum(item["is_match"] for item in scored)
+    assert matches / len(scored) == pytest.approx(match_rate, abs=0.02)
+    if n == 1:
+        # Only the 2-back stimulus can be a lure, and it may equal the target.
+        assert lures / len(scored) <= lure_rate + 0.02
+    else:
+        assert lures / len(scored) == pytest.approx(lure_rate, abs=0.02)
+
+
+def test_same_seed_same_stream():
+    a, b = NBackStream(2, seed=42), NBackStream(2, seed=42)
+    assert list(a.take(200)) == list(b.take(200))
+    assert a == b
+    assert list(NBackStream(2, seed=43).take(200)) != list(NBackStream(2, seed=42).take(200))
+
+
+@pytest.mark.parametrize("kwargs", [{"n": 0}, {"n": 5}, {"match_rate": -0.1}, {"match_rate": 0.8, "lure_rate": 0.3}])
+def test_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        NBackStream(**kwargs)
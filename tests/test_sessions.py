@@ -0,0 +1,47 @@
+"""The API's session table with event logs: restore after a restart, delete and expiry."""
+from api.sessions import SessionTable
+
+
+def start(table, game="pathfinder"):
+    session = table.create(game)
+    session.adapter.start(session.game, {"mode": "board"})
+    return session
+
+
+def test_restore_after_restart(tmp_path):
+    table = SessionTable(event_dir=str(tmp_path))
+    session = start(table)
+    session.adapter.answer(session.game, {"rotate": 0})
+    state = session.adapter.view(session.state[session.adapter.game_class.state_key])
+
+    restarted = SessionTable(event_dir=str(tmp_path))
+    restored = restarted.get(session.id)
+    assert restored is not None and restored.game_name == "pathfinder"
+    assert restored.adapter.view(restored.state["pathfinder"]) == state
+
+
+def test_deleted_session_stays_deleted(tmp_path):
+    table = SessionTable(event_dir=str(tmp_path))
+    session = start(table)
+    session.adapter.answer(session.game, {"rotate": 0})
+    assert table.delete(session.id)
+    assert table.get(session.id) is None
+    assert SessionTable(event_dir=str(tmp_path)).get(session.id) is None
+    assert not table.delete(session.id)
+
+
+def test_delete_after_restart(tmp_path):
+    session = start(SessionTable(event_dir=str(tmp_path)))
+    restarted = SessionTable(event_dir=str(tmp_path))
+    assert restarted.delete(session.id)
+    assert restarted.get(session.id) is None
+
+
+def test_expired_session_is_closed(tmp_path, monkeypatch):
+    table = SessionTable(ttl=60, event_dir=str(tmp_path))
+    session = start(table)
+    clock = [session.last_seen + 61]
+    monkeypatch.setattr("api.sessions.time.monotonic", lambda: clock[0])
+    assert table.get(session.id) is None
+    assert session.event_log.closed
+    assert len(table) == 0
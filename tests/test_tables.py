@@ -0,0 +1,16 @@
+"""The shared tables stay immutable however sessions use what they hand out."""
+import random
+
+from games import PathfinderGame, SessionState, tables
+
+
+def test_pathfinder_puzzles_share_nothing_with_the_table():
+    before = tables.get().pathfinder_templates
+    game = PathfinderGame(SessionState(), rng=random.Random(0))
+    first, second = game.make_puzzle(), game.make_puzzle()
+    for puzzle in (first, second):
+        for piece in puzzle["correct_order"]:
+            piece["open_edges"].append("up")
+            piece["type"] = "changed"
+    assert tables.get().pathfinder_templates == before == tables.build().pathfinder_templates
+    assert not {id(p) for p in first["correct_order"]} & {id(p) for p in second["correct_order"]}
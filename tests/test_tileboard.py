@@ -0,0 +1,60 @@
+"""Connectivity against components recomputed from scratch after every rotation."""
+import random
+
+import pytest
+
+from games.tileboard import EDGES, Connectivity, generate_board, linked, rotate
+
+
+def components(board):
+    """Brute force: a fresh search from every tile."""
+    size, tiles = board["size"], board["tiles"]
+    result = []
+    for start in range(len(tiles)):
+        seen, stack = {start}, [start]
+        while stack:
+            for other in linked(size, tiles, stack.pop()):
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+        result.append(seen)
+    return result
+
+
+def check(links, board):
+    expected = components(board)
+    for index, component in enumerate(expected):
+        assert links.component(index) == component
+    assert links.solved() == (board["goal"] in expected[board["start"]])
+
+
+@pytest.mark.parametrize("size", [2, 3, 5, 8])
+def test_generated_boards(size):
+    rng = random.Random(size)
+    board = generate_board(size, rng)
+    links = Connectivity(board)
+    check(links, board)
+    assert not links.solved()
+    for _ in range(300):
+        links.rotate(rng.randrange(size * size), rng.randrange(1, 4))
+        check(links, board)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_tiles(seed):
+    # Any masks, including crosses and empty tiles, so rotations can drop several links at once.
+    rng = random.Random(seed)
+    size = 4
+    board = {"size": size, "tiles": [rng.randrange(16) for _ in range(size * size)], "start": 0, "goal": size * size - 1}
+    links = Connectivity(board)
+    check(links, board)
+    for _ in range(300):
+        links.rotate(rng.randrange(size * size), rng.randrange(1, 4))
+        check(links, board)
+
+
+def test_rotate_is_a_quarter_turn():
+    for mask in range(16):
+        assert rotate(mask, 4) == mask
+        assert rotate(mask).bit_count() == mask.bit_count()
+    assert [rotate(edge) for edge in EDGES] == [EDGES[1], EDGES[2], EDGES[3], EDGES[0]]
@@ -0,0 +1,103 @@
+"""TimerWheel against a brute-force list of deadlines."""
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from runtime import timers
+from runtime.timers import Timer, TimerWheel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fires_like_a_sorted_list(seed):
+    rng = random.Random(seed)
+    clock = FakeClock()
+    # Small rings so that timers cascade through every level.
+    wheel = TimerWheel(tick=1.0, bits=2, levels=3, clock=clock)
+    horizon = wheel.size ** wheel.levels
+    fired, expected, pending = [], [], {}
+
+    for step in range(400):
+        action = rng.random()
+        if action < 0.5:
+            # Whole ticks, so the reference knows the exact tick each timer is due.
+            deadline = clock.now + rng.randrange(0, horizon - 1)
+            name = (seed, step)
+            pending[name] = (max(clock.now + 1, deadline), wheel.schedule(deadline, lambda n=name: fired.append(n)))
+        elif action < 0.65 and pending:
+            name = rng.choice(sorted(pending))
+            assert wheel.cancel(pending.pop(name)[1])
+        else:
+            clock.now += rng.randrange(0, 20)
+            due = sorted((name for name, (at, _) in pending.items() if at <= clock.now),
+                         key=lambda name: pending[name][0])
+            for name in due:
+                del pending[name]
+            before = len(fired)
+            assert wheel.advance() == len(due)
+            assert sorted(fired[before:]) == sorted(due)
+            expected += due
+        assert wheel.pending == len(pending)
+
+    assert sorted(fired) == sorted(expected)
+
+
+def test_cancel_after_firing():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=1.0, bits=2, levels=2, clock=clock)
+    timer = wheel.schedule(3, lambda: None)
+    clock.now = 3
+    assert wheel.advance() == 1
+    assert not wheel.cancel(timer)
+    assert wheel.pending == 0
+
+
+def test_failing_callback_does_not_stop_the_wheel():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=1.0, bits=2, levels=2, clock=clock)
+    fired = []
+    wheel.schedule(1, lambda: 1 / 0)
+    wheel.schedule(1, lambda: fired.append(1))
+    clock.now = 1
+    assert wheel.advance() == 2
+    assert fired == [1]
+
+
+def test_wakeup_fired_before_schedule_returns(monkeypatch):
+    # A wheel thread that is behind can fire a near deadline while schedule() is still running.
+    class BehindWheel:
+        def __init__(self):
+            self.threads = []
+
+        def schedule(self, deadline, callback):
+            thread = threading.Thread(target=callback)
+            thread.start()
+            thread.join(0.1)
+            self.threads.append(thread)
+            return Timer(0, callback)
+
+        def start(self):
+            pass
+
+    wheel = BehindWheel()
+    woken = []
+    monkeypatch.setattr(timers, "wheel", wheel)
+    monkeypatch.setattr(timers, "wake_session", woken.append)
+    monkeypatch.setattr(timers, "get_script_run_ctx", lambda: SimpleNamespace(session_id="s1"))
+    monkeypatch.setattr(timers.Runtime, "exists", staticmethod(lambda: True))
+
+    assert timers.request_wakeup("stimulus_hide", time.time() + 0.01)
+    for thread in wheel.threads:
+        thread.join()
+    assert woken == ["s1"]
+    assert "s1" not in timers._deadlines
@@ -0,0 +1,25 @@
+"""Pausing a game for a hidden tab resumes its clock and stimulus exactly where they stopped."""
+import time
+
+from runtime.visibility import resume, suspend
+
+
+def test_resume_shifts_the_clock_and_the_stimulus(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("runtime.visibility.time.time", lambda: now[0])
+    state = {"start_time": 990.0, "shown_at": 999.0, "display_time": 2}
+    suspend(state)
+    now[0] += 30
+    suspend(state)  # already paused: keeps the first pause time
+    now[0] += 30
+    resume(state)
+    assert state == {"start_time": 1050.0, "shown_at": 1059.0, "display_time": 2}
+    # One second of the two-second display is left.
+    assert state["shown_at"] + state["display_time"] - now[0] == 1
+
+
+def test_resume_without_a_stimulus():
+    state = {"start_time": time.time(), "shown_at": None}
+    suspend(state)
+    resume(state)
+    assert state["shown_at"] is None and "paused_at" not in state